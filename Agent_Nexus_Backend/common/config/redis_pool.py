@@ -0,0 +1,49 @@
+import os
+import asyncio
+from typing import Dict, Optional, Any
+from common.config.settings import settings
+from common.config.logging import logger
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+class RedisPool:
+    _instance: Optional['RedisPool'] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RedisPool, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.url = str(settings.REDIS_URL) if settings.REDIS_URL else None
+        self.max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", 100))
+        # Binary callers (vector blobs, msgpack) need undecoded replies: one client per mode.
+        self._clients: Dict[bool, Any] = {}
+        self._initialized = True
+
+    def client(self, decode_responses: bool = True) -> Optional[Any]:
+        if redis is None or not self.url:
+            return None
+
+        if decode_responses not in self._clients:
+            self._clients[decode_responses] = redis.from_url(
+                self.url,
+                decode_responses=decode_responses,
+                max_connections=self.max_connections
+            )
+        return self._clients[decode_responses]
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*[client.close() for client in clients], return_exceptions=True)
+        logger.info(f"REDIS_POOL_CLOSED | Clients: {len(clients)}")
+
+redis_pool = RedisPool()
@@ -0,0 +1,107 @@
+import json
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
+from common.config.logging import logger
+from common.config.redis_pool import redis_pool
+
+class VersionedCache:
+    label: str = "VERSIONED_CACHE"
+
+    def __init__(self, namespace: str, ttl: int, enabled: bool = True):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def _get_redis(self):
+        return redis_pool.client() if self.enabled else None
+
+    def _digest_key(self, scope: str, material: Dict[str, Any]) -> str:
+        encoded = json.dumps(material, sort_keys=True, default=str).encode("utf-8")
+        digest = hashlib.sha256(encoded).hexdigest()
+        return f"{self.namespace}:{scope}:{digest}"
+
+    async def _lookup(
+        self,
+        version_keys: List[str],
+        key: str
+    ) -> Tuple[Tuple[int, ...], Optional[Any]]:
+        # Entries remember the versions they were built under; any bump since then makes them stale.
+        client = self._get_redis()
+        if client is None:
+            return tuple(0 for _ in version_keys), None
+
+        try:
+            *raw_versions, raw_entry = await client.mget(*version_keys, key)
+        except Exception as e:
+            logger.warning(f"{self.label}_READ_FAILED | Key: {key} | Error: {str(e)}")
+            return tuple(0 for _ in version_keys), None
+
+        versions = tuple(int(raw or 0) for raw in raw_versions)
+        if raw_entry is None:
+            self.misses += 1
+            return versions, None
+
+        try:
+            entry = json.loads(raw_entry)
+            entry_versions, value = tuple(entry["versions"]), entry["value"]
+        except Exception as e:
+            # A corrupt or truncated entry is a miss; dropping it lets the next store replace it.
+            logger.warning(f"{self.label}_ENTRY_CORRUPT | Key: {key} | Error: {str(e)}")
+            self.misses += 1
+            await self._discard(key)
+            return versions, None
+
+        if entry_versions != versions:
+            self.stale += 1
+            return versions, None
+
+        self.hits += 1
+        return versions, value
+
+    async def _store(self, key: str, versions: Tuple[int, ...], value: Any):
+        client = self._get_redis()
+        if client is None:
+            return
+
+        try:
+            entry = json.dumps({"versions": list(versions), "value": value}, default=str)
+            await client.set(key, entry, ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"{self.label}_WRITE_FAILED | Error: {str(e)}")
+
+    async def _discard(self, key: str):
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.delete(key)
+        except Exception as e:
+            logger.warning(f"{self.label}_DISCARD_FAILED | Error: {str(e)}")
+
+    async def _read_version(self, version_key: str) -> Optional[int]:
+        client = self._get_redis()
+        if client is None:
+            return None
+
+        try:
+            return int(await client.get(version_key) or 0)
+        except Exception as e:
+            logger.warning(f"{self.label}_READ_FAILED | Key: {version_key} | Error: {str(e)}")
+            return None
+
+    async def _bump(self, version_key: str) -> Optional[int]:
+        client = self._get_redis()
+        if client is None:
+            return None
+
+        try:
+            return await client.incr(version_key)
+        except Exception as e:
+            logger.warning(f"{self.label}_BUMP_FAILED | Key: {version_key} | Error: {str(e)}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale}
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from data_sdk.ingestion import DataIngestor
 from data_sdk.transformation import DataTransformer
 from data_sdk.enrichment import DataEnricher
@@ -30,6 +30,17 @@ class DataSDK:
         
         return enriched_data
 
+    async def stream_index(
+        self,
+        documents: AsyncIterator[Dict[str, Any]],
+        collection_name: str,
+        pipeline_config: Optional[Dict[str, Any]] = None,
+        trace_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        from common.vector.pipeline import IndexPipeline
+        pipeline = IndexPipeline(collection_name, **(pipeline_config or {}))
+        return await pipeline.run(documents, trace_id=trace_id)
+
     async def ship_data(self, data: Any, destination: str, config: Dict[str, Any]):
         return await self.exporter.export(data, destination, config)
 
@@ -1,10 +1,18 @@
-from typing import Dict, Any, Optional
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set
+from common.config.logging import logger
 from common.memory.facade import MemoryFacade
 from common.memory.short_term import ShortTermMemory
 from common.memory.long_term import LongTermMemory
 from common.memory.episodic import EpisodicMemory
 from common.memory.semantic import SemanticMemory
 from common.memory.compressor import MemoryCompressor
+from common.memory.packer import ContextPacker, PackedContext
+from common.memory.recall_cache import RecallCache, recall_cache
+from common.memory.near_cache import ShortTermNearCache, stm_near_cache
 
 class MemorySystem:
     _instance: Optional['MemorySystem'] = None
@@ -18,29 +26,118 @@ class MemorySystem:
     def __init__(self):
         if self._initialized:
             return
-        self._facade_cache: Dict[str, MemoryFacade] = {}
+        self.max_facades = int(os.getenv("MEMORY_FACADE_CACHE_SIZE", 1024))
+        self.idle_ttl = float(os.getenv("MEMORY_FACADE_IDLE_TTL", 900))
+        self._facade_cache: "OrderedDict[str, MemoryFacade]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evicted_capacity = 0
+        self.evicted_idle = 0
         self.compressor = MemoryCompressor()
         self._initialized = True
 
+    def _build_facade(self, trace_id: str, agent_id: str) -> MemoryFacade:
+        facade = MemoryFacade(
+            trace_id=trace_id,
+            agent_id=agent_id,
+            short_term=ShortTermMemory(trace_id),
+            long_term=LongTermMemory(agent_id),
+            episodic=EpisodicMemory(trace_id),
+            semantic=SemanticMemory(),
+            compressor=self.compressor
+        )
+        facade.add_close_hook(facade.short_term.release)
+        return facade
+
     def get_facade(self, trace_id: str, agent_id: str) -> MemoryFacade:
+        if self.max_facades <= 0:
+            # Caching disabled: every caller gets its own live facade.
+            self.misses += 1
+            return self._build_facade(trace_id, agent_id)
+
         cache_key = f"{agent_id}:{trace_id}"
-        if cache_key not in self._facade_cache:
-            self._facade_cache[cache_key] = MemoryFacade(
-                trace_id=trace_id,
-                agent_id=agent_id,
-                short_term=ShortTermMemory(trace_id),
-                long_term=LongTermMemory(agent_id),
-                episodic=EpisodicMemory(trace_id),
-                semantic=SemanticMemory(),
-                compressor=self.compressor
-            )
-        return self._facade_cache[cache_key]
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        facade = self._facade_cache.get(cache_key)
+        if facade is None:
+            self.misses += 1
+            facade = self._facade_cache[cache_key] = self._build_facade(trace_id, agent_id)
+            while len(self._facade_cache) > self.max_facades:
+                self._retire(next(iter(self._facade_cache)), "capacity")
+        else:
+            self.hits += 1
+            self._facade_cache.move_to_end(cache_key)
+
+        self._last_used[cache_key] = now
+        return facade
+
+    def _evict_idle(self, now: float):
+        # Entries are kept in last-use order, so only the oldest ones ever need checking.
+        while self._facade_cache:
+            oldest = next(iter(self._facade_cache))
+            if now - self._last_used[oldest] < self.idle_ttl:
+                break
+            self._retire(oldest, "idle")
+
+    def _retire(self, cache_key: str, reason: str):
+        facade = self._facade_cache.pop(cache_key)
+        self._last_used.pop(cache_key, None)
+        if reason == "idle":
+            self.evicted_idle += 1
+        else:
+            self.evicted_capacity += 1
+        logger.info(f"MEMORY_FACADE_EVICTED | Key: {cache_key} | Reason: {reason}")
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(facade.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def sweep(self):
+        self._evict_idle(time.monotonic())
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._facade_cache),
+            "max_size": self.max_facades,
+            "idle_ttl": self.idle_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evicted_capacity": self.evicted_capacity,
+            "evicted_idle": self.evicted_idle,
+            "closing": len(self._closing)
+        }
 
     async def clear_trace_context(self, trace_id: str, agent_id: str):
         cache_key = f"{agent_id}:{trace_id}"
         if cache_key in self._facade_cache:
             facade = self._facade_cache.pop(cache_key)
+            self._last_used.pop(cache_key, None)
             await facade.short_term.clear()
+            await facade.close()
+        await self.compressor.reset_summary(trace_id)
+
+    async def close(self):
+        facades = list(self._facade_cache.values())
+        self._facade_cache.clear()
+        self._last_used.clear()
+        await asyncio.gather(
+            *[facade.close() for facade in facades],
+            *self._closing,
+            stm_near_cache.close(),
+            return_exceptions=True
+        )
+        logger.info(f"MEMORY_SYSTEM_CLOSED | Facades: {len(facades)}")
 
 memory_system = MemorySystem()
 
@@ -51,5 +148,11 @@ __all__ = [
     "EpisodicMemory",
     "SemanticMemory",
     "MemoryCompressor",
+    "ContextPacker",
+    "PackedContext",
+    "RecallCache",
+    "recall_cache",
+    "ShortTermNearCache",
+    "stm_near_cache",
     "memory_system"
 ]
\ No newline at end of file
@@ -1,18 +1,135 @@
+import os
 import json
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from common.ai_sdk.llm_provider import llm_provider
 from common.config.logging import logger
+from common.config.redis_pool import redis_pool
+from common.memory.packer import ContextPacker
 from common.schemas.errors import AppError, ErrorCategory
 
+def _stamp(item: Any) -> str:
+    return str(item.get("timestamp", "")) if isinstance(item, dict) else ""
+
+def _marker(item: Any) -> str:
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _unfolded(items: List[Any], watermark: str, marker: str) -> List[Any]:
+    # Turns arrive in insertion order, so anything after the last folded turn is new.
+    if marker:
+        for position in range(len(items) - 1, -1, -1):
+            if _marker(items[position]) == marker:
+                return items[position + 1:]
+    return [item for item in items if not _stamp(item) or _stamp(item) > watermark]
+
 class MemoryCompressor:
-    def __init__(self, model_name: str = "gpt-4o-mini", token_limit: int = 1000):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        token_limit: int = 1000,
+        summary_budget: Optional[int] = None
+    ):
         self.model_name = model_name
         self.token_limit = token_limit
+        self.summary_budget = summary_budget or token_limit // 4
+        self.summary_ttl = int(os.getenv("MEMORY_SUMMARY_TTL", 86400))
+        self.output_ttl = int(os.getenv("MEMORY_COMPRESSION_CACHE_TTL", 3600))
+        self.packer = ContextPacker(model=model_name, importance=self.calculate_importance)
         self.compression_prompt = (
             "Summarize the following conversation fragments into a dense, high-fidelity "
             "representation. Extract key entities, decisions, and unresolved tasks. "
             "Maintain technical precision while reducing word count by 70%."
         )
+        self.digest_prompt = (
+            f"{self.compression_prompt} Keep the result under {self.summary_budget // 2} tokens."
+        )
+        self.rolling_prompt = (
+            "You maintain a running summary of a conversation. Fold the new fragments into the "
+            "current summary, keeping key entities, decisions, and unresolved tasks. "
+            f"Return only the updated summary, in under {self.summary_budget // 2} tokens."
+        )
+
+    async def _load_summary(self, trace_id: str) -> Tuple[str, str, str]:
+        client = redis_pool.client()
+        if client is None:
+            return "", "", ""
+        try:
+            state = await client.hgetall(f"msum:{trace_id}")
+            return state.get("summary", ""), state.get("watermark", ""), state.get("marker", "")
+        except Exception as e:
+            logger.warning(f"MEMORY_SUMMARY_READ_FAILED | Trace: {trace_id} | Error: {str(e)}")
+            return "", "", ""
+
+    async def _save_summary(self, trace_id: str, summary: str, watermark: str, marker: str):
+        client = redis_pool.client()
+        if client is None:
+            return
+        try:
+            key = f"msum:{trace_id}"
+            async with client.pipeline(transaction=True) as pipe:
+                await pipe.hset(
+                    key,
+                    mapping={"summary": summary, "watermark": watermark, "marker": marker}
+                )
+                await pipe.expire(key, self.summary_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"MEMORY_SUMMARY_WRITE_FAILED | Trace: {trace_id} | Error: {str(e)}")
+
+    async def _cached_completion(
+        self,
+        system_prompt: str,
+        user_message: str,
+        trace_id: Optional[str]
+    ) -> str:
+        client = redis_pool.client()
+        material = f"{self.model_name}\0{system_prompt}\0{user_message}"
+        digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        key = f"mcmp:{digest}"
+
+        if client is not None:
+            try:
+                cached = await client.get(key)
+                if cached is not None:
+                    logger.info(f"MEMORY_COMPRESSION_CACHE_HIT | Trace: {trace_id}")
+                    return cached
+            except Exception as e:
+                logger.warning(
+                    f"MEMORY_COMPRESSION_CACHE_READ_FAILED | Trace: {trace_id} | Error: {str(e)}"
+                )
+
+        output = await llm_provider.generate_completion(
+            model=self.model_name,
+            system_prompt=system_prompt,
+            user_message=user_message,
+            temperature=0.1,
+            trace_id=trace_id
+        )
+
+        if client is not None and output:
+            try:
+                await client.set(key, output, ex=self.output_ttl)
+            except Exception as e:
+                logger.warning(
+                    f"MEMORY_COMPRESSION_CACHE_WRITE_FAILED | Trace: {trace_id} | Error: {str(e)}"
+                )
+        return output
+
+    async def _fold_summary(self, trace_id: str, summary: str, items: List[Dict[str, Any]]) -> str:
+        summary = await self._cached_completion(
+            self.rolling_prompt,
+            f"CURRENT_SUMMARY: {summary or '(empty)'}\n"
+            f"NEW_FRAGMENTS: {json.dumps(items, default=str)}",
+            trace_id
+        )
+        watermark = _stamp(items[-1])
+        await self._save_summary(trace_id, summary, watermark, _marker(items[-1]))
+
+        logger.info(
+            f"MEMORY_SUMMARY_ROLLED | Trace: {trace_id} | Folded: {len(items)} | "
+            f"Watermark: {watermark}"
+        )
+        return summary
 
     async def synthesize(
         self,
@@ -25,30 +142,66 @@ class MemoryCompressor:
             if not any([short, long, semantic]):
                 return ""
 
-            payload = {
+            sections = {
                 "short_term_context": short[-10:],
                 "historical_context": long[:5],
                 "semantic_facts": semantic
             }
 
-            raw_content = json.dumps(payload)
-            
-            if len(raw_content) < (self.token_limit * 3):
+            raw_content = json.dumps(sections, default=str)
+
+            if self.packer.fits(raw_content, self.token_limit):
                 return raw_content
 
-            compressed_output = await llm_provider.generate_completion(
-                model=self.model_name,
-                system_prompt=self.compression_prompt,
-                user_message=f"DATA_TO_COMPRESS: {raw_content}",
-                temperature=0.1,
-                trace_id=trace_id
+            summary, watermark, marker = (
+                await self._load_summary(trace_id) if trace_id else ("", "", "")
             )
+            # Turns already covered by the running summary are never packed or summarized again.
+            pending = _unfolded(sections["short_term_context"], watermark, marker)
+            sections["short_term_context"] = pending
+
+            packed = self.packer.pack(sections, self.token_limit - self.summary_budget)
+            context: Dict[str, Any] = dict(packed.sections)
+            overflow = {name: items for name, items in packed.overflow.items() if items}
+
+            if trace_id and overflow.get("short_term_context"):
+                # Folding up to the newest overflowed turn keeps the watermark contiguous.
+                overflowed = {id(item) for item in overflow.pop("short_term_context")}
+                cut = max(i for i, item in enumerate(pending) if id(item) in overflowed) + 1
+                summary = await self._fold_summary(trace_id, summary, pending[:cut])
+                context["short_term_context"] = pending[cut:]
 
-            return compressed_output
+            if overflow:
+                context["overflow_digest"] = await self._cached_completion(
+                    self.digest_prompt,
+                    f"DATA_TO_COMPRESS: {json.dumps(overflow, default=str)}",
+                    trace_id
+                )
+
+            if summary:
+                context = {"conversation_summary": summary, **context}
+
+            raw_content = json.dumps(context, default=str)
+            logger.info(
+                f"MEMORY_CONTEXT_PACKED | Trace: {trace_id} | "
+                f"Tokens: {self.packer.count(raw_content)} | "
+                f"Budget: {self.token_limit} | "
+                f"Overflow: {sum(len(items) for items in packed.overflow.values())}"
+            )
+            return raw_content
 
         except Exception as e:
             logger.error(f"MEMORY_COMPRESSION_FAILURE | Trace: {trace_id} | Error: {str(e)}")
-            return json.dumps(short[-3:])
+            return json.dumps(short[-3:], default=str)
+
+    async def reset_summary(self, trace_id: str):
+        client = redis_pool.client()
+        if client is None:
+            return
+        try:
+            await client.delete(f"msum:{trace_id}")
+        except Exception as e:
+            logger.warning(f"MEMORY_SUMMARY_RESET_FAILED | Trace: {trace_id} | Error: {str(e)}")
 
     def calculate_importance(self, content: str) -> float:
         keywords = {"decision", "update", "fixed", "error", "critical", "goal", "user_preference"}
@@ -59,9 +212,9 @@ class MemoryCompressor:
     async def recursive_summarize(self, contents: List[str]) -> str:
         if not contents:
             return ""
-        
+
         combined = " | ".join(contents)
-        if len(combined) < self.token_limit:
+        if self.packer.fits(combined, self.token_limit):
             return combined
-            
-        return await self.synthesize([], [{"content": combined}], [])
\ No newline at end of file
+
+        return await self.synthesize([], [{"content": combined}], [])
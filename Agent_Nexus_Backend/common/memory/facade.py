@@ -1,13 +1,25 @@
+import os
 import asyncio
-from typing import Any, List, Dict, Optional
+import contextlib
+import functools
+from typing import Any, List, Dict, Optional, Callable, Awaitable, Tuple
 from common.memory.short_term import ShortTermMemory
 from common.memory.long_term import LongTermMemory
 from common.memory.episodic import EpisodicMemory
 from common.memory.semantic import SemanticMemory
 from common.memory.compressor import MemoryCompressor
+from common.memory.recall_cache import recall_cache
+from common.vector import vector_manifest
 from common.config.logging import logger
 from common.schemas.errors import AppError, ErrorCategory
 
+def _pinned(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self.in_use():
+            return await method(self, *args, **kwargs)
+    return wrapper
+
 class MemoryFacade:
     def __init__(
         self,
@@ -26,28 +38,117 @@ class MemoryFacade:
         self.episodic = episodic
         self.semantic = semantic
         self.compressor = compressor
+        self.recall_deadline = float(os.getenv("MEMORY_RECALL_DEADLINE", 0)) or None
+        self._close_hooks: List[Callable[[], Awaitable[Any]]] = []
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.closed = False
+
+    @contextlib.asynccontextmanager
+    async def in_use(self):
+        self._active += 1
+        self._idle.clear()
+        try:
+            yield self
+        finally:
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
 
-    async def recall(self, query: str, context_window: int = 5) -> str:
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
         try:
-            results = await asyncio.gather(
-                self.short_term.get_recent(limit=10),
-                self.long_term.search(query, limit=context_window),
-                self.episodic.get_high_importance_events(threshold=0.8),
-                self.semantic.query(query)
+            return await vector_manifest.embeddings.generate_single(query, trace_id=self.trace_id)
+        except Exception as e:
+            # Tiers fall back to embedding the query themselves.
+            logger.warning(f"MEMORY_RECALL_EMBED_FAILED | Trace: {self.trace_id} | Error: {str(e)}")
+            return None
+
+    async def _gather_tiers(
+        self,
+        query: str,
+        context_window: int,
+        deadline: Optional[float]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        embedding = asyncio.ensure_future(self._embed_query(query))
+
+        async def long_term_tier():
+            query_vector = await asyncio.shield(embedding)
+            return await self.long_term.search(
+                query,
+                limit=context_window,
+                query_vector=query_vector
             )
-            
-            short_data, long_data, episodic_data, semantic_data = results
 
-            return await self.compressor.synthesize(
-                short=short_data,
-                long=long_data,
-                semantic=semantic_data,
+        async def semantic_tier():
+            query_vector = await asyncio.shield(embedding)
+            return await self.semantic.query(query, query_vector=query_vector)
+
+        tasks = {
+            "short_term": asyncio.ensure_future(self.short_term.get_recent(limit=10)),
+            "long_term": asyncio.ensure_future(long_term_tier()),
+            "episodic": asyncio.ensure_future(
+                self.episodic.get_high_importance_events(threshold=0.8)
+            ),
+            "semantic": asyncio.ensure_future(semantic_tier())
+        }
+        done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if not embedding.done():
+            embedding.cancel()
+
+        results: Dict[str, Any] = {}
+        dropped: List[str] = []
+        for tier, task in tasks.items():
+            if task in done and task.exception() is None:
+                results[tier] = task.result()
+                continue
+            results[tier] = []
+            dropped.append(tier)
+            reason = "deadline" if task in pending else str(task.exception())
+            logger.warning(
+                f"MEMORY_RECALL_TIER_DROPPED | Trace: {self.trace_id} | Tier: {tier} | "
+                f"Reason: {reason}"
+            )
+        return results, dropped
+
+    @_pinned
+    async def recall(
+        self,
+        query: str,
+        context_window: int = 5,
+        deadline: Optional[float] = None
+    ) -> str:
+        try:
+            cache_key = recall_cache.make_key(self.agent_id, self.trace_id, query, context_window)
+            versions, cached = await recall_cache.lookup(
+                self.agent_id, self.trace_id, self.semantic.namespace, cache_key
+            )
+            if cached is not None:
+                return cached
+
+            tiers, dropped = await self._gather_tiers(
+                query,
+                context_window,
+                deadline or self.recall_deadline
+            )
+
+            context = await self.compressor.synthesize(
+                short=tiers["short_term"],
+                long=tiers["long_term"],
+                semantic=tiers["semantic"],
                 trace_id=self.trace_id
             )
+            # Partial recalls are served once but never cached.
+            if context and not dropped:
+                await recall_cache.store(cache_key, versions, context)
+            return context
         except Exception as e:
             logger.error(f"MEMORY_FACADE_RECALL_ERROR | Trace: {self.trace_id} | {str(e)}")
             return ""
 
+    @_pinned
     async def commit(self, content: Any, importance: Optional[float] = None):
         if importance is None:
             importance = self.compressor.calculate_importance(str(content))
@@ -71,8 +172,10 @@ class MemoryFacade:
                 )
             )
 
+        # Each tier invalidates cached recalls itself, covering writes that bypass the facade.
         await asyncio.gather(*commit_tasks)
 
+    @_pinned
     async def get_working_context(self) -> Dict[str, Any]:
         return {
             "trace_id": self.trace_id,
@@ -81,5 +184,24 @@ class MemoryFacade:
             "milestones": await self.episodic.get_event_stream(limit=3)
         }
 
+    @_pinned
     async def wipe_short_term(self):
-        await self.short_term.clear()
\ No newline at end of file
+        await self.short_term.clear()
+
+    def add_close_hook(self, hook: Callable[[], Awaitable[Any]]):
+        self._close_hooks.append(hook)
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # An eviction can race with callers still using this facade; hooks run once they finish.
+        await self._idle.wait()
+        hooks, self._close_hooks = self._close_hooks, []
+        results = await asyncio.gather(*[hook() for hook in hooks], return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"MEMORY_FACADE_CLOSE_HOOK_FAILED | Trace: {self.trace_id} | "
+                    f"Error: {str(result)}"
+                )
@@ -1,78 +1,81 @@
 import uuid
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from common.ai_sdk.llm_provider import llm_provider
+from common.vector import vector_manifest
+from common.memory.recall_cache import recall_cache
 from common.config.logging import logger
 from common.schemas.errors import AppError, ErrorCategory
 
+_MEMORY_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "agent-nexus/long-term-memory")
+
 class LongTermMemory:
     def __init__(self, agent_id: str, collection_name: str = "agent_knowledge"):
         self.agent_id = agent_id
         self.collection_name = collection_name
-        self.vector_db = None 
+        self.indexer = vector_manifest.indexer(collection_name)
+        self.searcher = vector_manifest.searcher(collection_name)
 
-    async def _get_embedding(self, text: str) -> List[float]:
-        try:
-            return await llm_provider.get_embeddings(text)
-        except Exception as e:
-            logger.error(f"EMBEDDING_GENERATION_FAILED | Agent: {self.agent_id} | Error: {str(e)}")
-            raise AppError(
-                message="Failed to generate vector embeddings for long-term memory",
-                category=ErrorCategory.INTERNAL_ERROR,
-                status_code=500
-            )
+    def _content_identity(self, content: str) -> Tuple[str, str]:
+        # Stable across processes, unlike hash(), so identical memories collapse onto one point.
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        doc_id = str(uuid.uuid5(_MEMORY_NAMESPACE, f"{self.agent_id}:{content_hash}"))
+        return doc_id, content_hash
 
-    async def store(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
-        doc_id = str(uuid.uuid4())
-        embedding = await self._get_embedding(content)
-        
-        extended_metadata = {
+    def _extended_metadata(
+        self,
+        content_hash: str,
+        metadata: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
             **(metadata or {}),
             "agent_id": self.agent_id,
             "created_at": datetime.utcnow().isoformat(),
-            "content_hash": hash(content)
+            "content_hash": content_hash
         }
 
+    async def store(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        doc_id, content_hash = self._content_identity(content)
+        extended_metadata = self._extended_metadata(content_hash, metadata)
+
         try:
-            from common.db.vector_client import vector_client
-            await vector_client.upsert(
-                collection=self.collection_name,
-                points=[{
-                    "id": doc_id,
-                    "vector": embedding,
-                    "payload": {
-                        "content": content,
-                        "metadata": extended_metadata
-                    }
-                }]
+            report = await self.indexer.upsert_documents(
+                texts=[content],
+                metadata=[{"metadata": extended_metadata}],
+                ids=[doc_id],
+                dedup_scope=self.agent_id
             )
-            return doc_id
+            if report.upserted_count:
+                await recall_cache.invalidate_agent(self.agent_id)
+            return report.duplicates.get(doc_id, doc_id) if report else ""
         except Exception as e:
             logger.error(f"VECTOR_STORE_FAILURE | Agent: {self.agent_id} | Error: {str(e)}")
             return ""
 
-    async def search(self, query: str, limit: int = 5, min_score: float = 0.7) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        query: str,
+        limit: int = 5,
+        min_score: float = 0.7,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        options = {
+            "limit": limit,
+            "score_threshold": min_score,
+            "filters": {"metadata.agent_id": self.agent_id},
+            "payload_fields": ["content", "metadata"]
+        }
         try:
-            query_vector = await self._get_embedding(query)
-            from common.db.vector_client import vector_client
-            
-            results = await vector_client.search(
-                collection=self.collection_name,
-                query_vector=query_vector,
-                query_filter={
-                    "must": [
-                        {"key": "metadata.agent_id", "match": {"value": self.agent_id}}
-                    ]
-                },
-                limit=limit,
-                score_threshold=min_score
-            )
+            if query_vector is not None:
+                results = await self.searcher.search_by_vector(query_vector, **options)
+            else:
+                results = await self.searcher.search(query, **options)
 
             return [
                 {
-                    "content": res.payload["content"],
-                    "metadata": res.payload["metadata"],
-                    "score": res.score
+                    "content": res["payload"]["content"],
+                    "metadata": res["payload"]["metadata"],
+                    "score": res["score"]
                 }
                 for res in results
             ]
@@ -80,18 +83,53 @@ class LongTermMemory:
             logger.warning(f"VECTOR_SEARCH_FALLBACK | Agent: {self.agent_id} | Error: {str(e)}")
             return []
 
-    async def batch_store(self, items: List[Dict[str, Any]]):
+    async def batch_store(self, items: List[Dict[str, Any]]) -> List[str]:
+        item_ids: List[str] = []
+        unique: Dict[str, Tuple[str, Dict[str, Any]]] = {}
         for item in items:
-            await self.store(item["content"], item.get("metadata"))
+            content = item["content"]
+            doc_id, content_hash = self._content_identity(content)
+            item_ids.append(doc_id)
+            if doc_id not in unique:
+                extended = self._extended_metadata(content_hash, item.get("metadata"))
+                unique[doc_id] = (content, extended)
 
-    async def delete_by_filter(self, filter_criteria: Dict[str, Any]):
-        from common.db.vector_client import vector_client
-        await vector_client.delete(
-            collection=self.collection_name,
-            filter_criteria={
-                "must": [
-                    {"key": "metadata.agent_id", "match": {"value": self.agent_id}},
-                    *[{"key": f"metadata.{k}", "match": {"value": v}} for k, v in filter_criteria.items()]
-                ]
-            }
-        )
\ No newline at end of file
+        if not unique:
+            return []
+
+        try:
+            report = await self.indexer.upsert_documents(
+                texts=[content for content, _ in unique.values()],
+                metadata=[{"metadata": extended} for _, extended in unique.values()],
+                ids=list(unique),
+                dedup_scope=self.agent_id
+            )
+        except Exception as e:
+            logger.error(
+                f"VECTOR_BATCH_STORE_FAILURE | Agent: {self.agent_id} | Count: {len(unique)} | "
+                f"Error: {str(e)}"
+            )
+            return ["" for _ in items]
+
+        if report.upserted_count:
+            await recall_cache.invalidate_agent(self.agent_id)
+
+        failed = {str(point_id) for point_id in report.failed_ids}
+        logger.info(
+            f"VECTOR_BATCH_STORE_COMPLETE | Agent: {self.agent_id} | Items: {len(items)} | "
+            f"Unique: {len(unique)} | Upserted: {report.upserted_count} | Failed: {len(failed)}"
+        )
+        return [
+            "" if doc_id in failed else report.duplicates.get(doc_id, doc_id)
+            for doc_id in item_ids
+        ]
+
+    async def delete_by_filter(self, filter_criteria: Dict[str, Any]) -> bool:
+        filters = {
+            **{f"metadata.{k}": v for k, v in filter_criteria.items()},
+            "metadata.agent_id": self.agent_id
+        }
+        deleted = await self.indexer.delete_by_filter(filters)
+        if deleted:
+            await recall_cache.invalidate_agent(self.agent_id)
+        return deleted
@@ -0,0 +1,162 @@
+import os
+import asyncio
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from common.config.logging import logger
+from common.config.redis_pool import redis_pool
+
+class ShortTermNearCache:
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        key_prefix: str = "stm:"
+    ):
+        self.enabled = os.getenv("STM_NEAR_CACHE_ENABLED", "false").lower() == "true"
+        self.max_entries = max_entries or int(os.getenv("STM_NEAR_CACHE_ENTRIES", 256))
+        self.max_bytes = max_bytes or int(os.getenv("STM_NEAR_CACHE_BYTES", 32 * 1024 * 1024))
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, Tuple[List[bytes], int]]" = OrderedDict()
+        self._epochs: Dict[str, int] = {}
+        self._generation = 0
+        self._bytes = 0
+        self._listener: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        self._ready = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def active(self) -> bool:
+        # Without a live invalidation stream the cache could serve stale history.
+        return self.enabled and self._ready
+
+    async def ensure_started(self):
+        if not self.enabled or self._ready:
+            return
+
+        async with self._start_lock:
+            if self._ready:
+                return
+            try:
+                client = redis_pool.client()
+                if client is None:
+                    raise RuntimeError("REDIS_UNAVAILABLE")
+                config = await client.config_get("notify-keyspace-events")
+                events = config.get("notify-keyspace-events", "")
+                if set("Klgxe") - set(events.replace("A", "g$lshzxet")):
+                    await client.config_set(
+                        "notify-keyspace-events",
+                        "".join(sorted(set(events) | set("Klgxe")))
+                    )
+
+                db = client.connection_pool.connection_kwargs.get("db", 0)
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(f"__keyspace@{db}__:{self.key_prefix}*")
+                self._listener = asyncio.create_task(self._listen(pubsub))
+                self._ready = True
+                logger.info(
+                    f"STM_NEAR_CACHE_STARTED | Entries: {self.max_entries} | "
+                    f"Bytes: {self.max_bytes}"
+                )
+            except Exception as e:
+                logger.warning(f"STM_NEAR_CACHE_DISABLED | Reason: {str(e)}")
+                self.enabled = False
+
+    async def _listen(self, pubsub: Any):
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "pmessage":
+                    continue
+                self.invalidate(message["channel"].split(":", 1)[1])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"STM_NEAR_CACHE_STREAM_LOST | Error: {str(e)}")
+        finally:
+            # Notifications may have been missed, so nothing cached so far can be trusted.
+            self._ready = False
+            self.clear()
+            await pubsub.close()
+
+    def epoch(self, key: str) -> Tuple[int, int]:
+        return self._generation, self._epochs.get(key, 0)
+
+    def get(self, key: str) -> Optional[List[bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, items: List[bytes], epoch: Tuple[int, int]):
+        # A write seen during the read bumps the epoch, and the fetched copy is discarded.
+        if not self.active or self.epoch(key) != epoch:
+            return
+
+        size = sum(len(item) for item in items)
+        if size > self.max_bytes:
+            return
+
+        self._drop(key)
+        self._entries[key] = (items, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def invalidate(self, key: str):
+        self._epochs[key] = self._epochs.get(key, 0) + 1
+        if key in self._entries:
+            self._drop(key)
+            self.invalidations += 1
+        if len(self._epochs) > self.max_entries * 4:
+            self._epochs.clear()
+            self._generation += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._generation += 1
+
+    @staticmethod
+    def slice(items: List[bytes], start: int, end: int) -> List[bytes]:
+        # LRANGE semantics: inclusive end, negative offsets from the tail, out-of-range clamped.
+        length = len(items)
+        first = start if start >= 0 else max(length + start, 0)
+        last = min(end if end >= 0 else length + end, length - 1)
+        return items[first:last + 1] if first <= last else []
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "active": self.active,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._ready = False
+        self.clear()
+
+stm_near_cache = ShortTermNearCache()
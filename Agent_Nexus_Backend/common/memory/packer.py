@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+from common.ai_sdk.tokenization import TokenCounter
+
+class PackedContext:
+    def __init__(
+        self,
+        sections: Dict[str, List[Any]],
+        overflow: Dict[str, List[Any]],
+        tokens: int
+    ):
+        self.sections = sections
+        self.overflow = overflow
+        self.tokens = tokens
+
+    @property
+    def has_overflow(self) -> bool:
+        return any(self.overflow.values())
+
+class ContextPacker:
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        importance: Optional[Callable[[str], float]] = None,
+        recency_weight: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        chronological: Iterable[str] = ("short_term_context",)
+    ):
+        self.model = model
+        self.importance = importance or (lambda text: 0.5)
+        if recency_weight is None:
+            recency_weight = float(os.getenv("MEMORY_PACKER_RECENCY_WEIGHT", 0.4))
+        self.recency_weight = recency_weight
+        self.cache_size = cache_size or int(os.getenv("MEMORY_PACKER_CACHE_SIZE", 4096))
+        self.chronological = set(chronological)
+        self.counter = TokenCounter()
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def serialize(value: Any) -> str:
+        return value if isinstance(value, str) else json.dumps(value, default=str)
+
+    def count(self, value: Any) -> int:
+        text = self.serialize(value)
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        cached = self._counts.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._counts.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        tokens = self.counter.count_tokens(text, model=self.model)
+        self._counts[key] = tokens
+        if len(self._counts) > self.cache_size:
+            self._counts.popitem(last=False)
+        return tokens
+
+    def fits(self, value: Any, budget: int) -> bool:
+        return self.count(value) <= budget
+
+    def score(self, item: Any, section: str, rank: int, size: int) -> float:
+        importance = None
+        if isinstance(item, dict):
+            importance = item.get("importance", (item.get("metadata") or {}).get("importance"))
+        if importance is None:
+            importance = self.importance(self.serialize(item))
+
+        # Conversation turns arrive oldest first; ranked tiers arrive best first.
+        if section in self.chronological:
+            recency = (rank + 1) / size
+        else:
+            recency = 1 - rank / size
+        return (1 - self.recency_weight) * float(importance) + self.recency_weight * recency
+
+    def pack(self, sections: Dict[str, List[Any]], budget: int) -> PackedContext:
+        candidates: List[Tuple[float, str, int]] = []
+        for name, items in sections.items():
+            for rank, item in enumerate(items):
+                candidates.append((self.score(item, name, rank, len(items)), name, rank))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        # Skeleton plus one separator per item keeps the total an upper bound on the real count.
+        used = self.count({name: [] for name in sections})
+        chosen = {name: set() for name in sections}
+        for _, name, rank in candidates:
+            tokens = self.count(sections[name][rank]) + 1
+            if used + tokens <= budget:
+                chosen[name].add(rank)
+                used += tokens
+
+        packed: Dict[str, List[Any]] = {}
+        overflow: Dict[str, List[Any]] = {}
+        for name, items in sections.items():
+            packed[name] = [item for rank, item in enumerate(items) if rank in chosen[name]]
+            overflow[name] = [item for rank, item in enumerate(items) if rank not in chosen[name]]
+        return PackedContext(packed, overflow, self.count(packed))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._counts),
+            "max_entries": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,65 @@
+import os
+from typing import Optional, Tuple
+from common.config.versioned_cache import VersionedCache
+
+class RecallCache(VersionedCache):
+    label = "RECALL_CACHE"
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        namespace: str = "mrec"
+    ):
+        super().__init__(
+            namespace,
+            ttl or int(os.getenv("MEMORY_RECALL_CACHE_TTL", 30)),
+            enabled=os.getenv("MEMORY_RECALL_CACHE_ENABLED", "true").lower() == "true"
+        )
+
+    def _agent_version_key(self, agent_id: str) -> str:
+        return f"{self.namespace}:ver:agent:{agent_id}"
+
+    def _trace_version_key(self, trace_id: str) -> str:
+        return f"{self.namespace}:ver:trace:{trace_id}"
+
+    def _semantic_version_key(self, namespace: str) -> str:
+        return f"{self.namespace}:ver:semantic:{namespace}"
+
+    def make_key(self, agent_id: str, trace_id: str, query: str, limit: int) -> str:
+        normalized = " ".join(query.lower().split())
+        return self._digest_key(
+            agent_id,
+            {"a": agent_id, "t": trace_id, "q": normalized, "l": limit}
+        )
+
+    async def lookup(
+        self,
+        agent_id: str,
+        trace_id: str,
+        semantic_namespace: str,
+        key: str
+    ) -> Tuple[Tuple[int, ...], Optional[str]]:
+        # Each tier bumps its own version on write: long-term per agent, short-term per trace,
+        # semantic per namespace.
+        return await self._lookup(
+            [
+                self._agent_version_key(agent_id),
+                self._trace_version_key(trace_id),
+                self._semantic_version_key(semantic_namespace)
+            ],
+            key
+        )
+
+    async def store(self, key: str, versions: Tuple[int, ...], value: str):
+        await self._store(key, versions, value)
+
+    async def invalidate_agent(self, agent_id: str) -> Optional[int]:
+        return await self._bump(self._agent_version_key(agent_id))
+
+    async def invalidate_trace(self, trace_id: str) -> Optional[int]:
+        return await self._bump(self._trace_version_key(trace_id))
+
+    async def invalidate_semantic(self, namespace: str) -> Optional[int]:
+        return await self._bump(self._semantic_version_key(namespace))
+
+recall_cache = RecallCache()
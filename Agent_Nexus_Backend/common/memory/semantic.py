@@ -1,7 +1,10 @@
+import os
 import uuid
+import asyncio
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from common.ai_sdk.llm_provider import llm_provider
+from common.vector import vector_manifest
+from common.memory.recall_cache import recall_cache
 from common.config.logging import logger
 from common.schemas.errors import AppError, ErrorCategory
 
@@ -9,43 +12,37 @@ class SemanticMemory:
     def __init__(self, collection_name: str = "global_semantic_knowledge"):
         self.collection_name = collection_name
         self.namespace = "shared_facts"
+        self.expansion_batch_size = int(os.getenv("SEMANTIC_EXPANSION_BATCH_SIZE", 16))
+        self.expansion_concurrency = int(os.getenv("SEMANTIC_EXPANSION_CONCURRENCY", 4))
+        self.expansion_hop_deadline = float(os.getenv("SEMANTIC_EXPANSION_HOP_DEADLINE", 0)) or None
+        self.indexer = vector_manifest.indexer(collection_name)
+        self.searcher = vector_manifest.searcher(collection_name)
 
-    async def _get_embedding(self, text: str) -> List[float]:
-        try:
-            return await llm_provider.get_embeddings(text)
-        except Exception as e:
-            logger.error(f"SEMANTIC_EMBEDDING_ERROR | Error: {str(e)}")
-            raise AppError(
-                message="Failed to generate embeddings for semantic lookup",
-                category=ErrorCategory.INTERNAL_ERROR,
-                status_code=500
-            )
-
-    async def query(self, concept: str, limit: int = 3) -> List[str]:
+    async def query(
+        self,
+        concept: str,
+        limit: int = 3,
+        query_vector: Optional[List[float]] = None
+    ) -> List[str]:
+        options = {
+            "limit": limit,
+            "score_threshold": 0.85,
+            "filters": {"metadata.namespace": self.namespace},
+            "payload_fields": ["fact"]
+        }
         try:
-            query_vector = await self._get_embedding(concept)
-            from common.db.vector_client import vector_client
-            
-            results = await vector_client.search(
-                collection=self.collection_name,
-                query_vector=query_vector,
-                query_filter={
-                    "must": [
-                        {"key": "metadata.namespace", "match": {"value": self.namespace}}
-                    ]
-                },
-                limit=limit,
-                score_threshold=0.85
-            )
+            if query_vector is not None:
+                results = await self.searcher.search_by_vector(query_vector, **options)
+            else:
+                results = await self.searcher.search(concept, **options)
 
-            return [res.payload["fact"] for res in results]
+            return [res["payload"]["fact"] for res in results]
         except Exception as e:
             logger.warning(f"SEMANTIC_QUERY_BYPASS | Reason: {str(e)}")
             return []
 
     async def anchor_fact(self, fact: str, metadata: Optional[Dict[str, Any]] = None):
         fact_id = str(uuid.uuid4())
-        embedding = await self._get_embedding(fact)
         
         payload = {
             "fact": fact,
@@ -58,23 +55,97 @@ class SemanticMemory:
         }
 
         try:
-            from common.db.vector_client import vector_client
-            await vector_client.upsert(
-                collection=self.collection_name,
-                points=[{
-                    "id": fact_id,
-                    "vector": embedding,
-                    "payload": payload
-                }]
+            report = await self.indexer.upsert_documents(
+                texts=[fact],
+                metadata=[payload],
+                ids=[fact_id],
+                dedup_scope=self.namespace
             )
-            return fact_id
+            if report.upserted_count:
+                await recall_cache.invalidate_semantic(self.namespace)
+            return report.duplicates.get(fact_id, fact_id) if report else None
         except Exception as e:
             logger.error(f"SEMANTIC_ANCHOR_FAILURE | Fact: {fact[:50]} | Error: {str(e)}")
             return None
 
-    async def get_related_concepts(self, concepts: List[str]) -> List[str]:
-        results = []
+    async def _expand_hop(
+        self,
+        frontier: List[str],
+        limit: int,
+        deadline: Optional[float]
+    ) -> List[List[Any]]:
+        slots = asyncio.Semaphore(self.expansion_concurrency)
+        chunks = [
+            frontier[i:i + self.expansion_batch_size]
+            for i in range(0, len(frontier), self.expansion_batch_size)
+        ]
+
+        async def expand_chunk(chunk: List[str]) -> List[List[Any]]:
+            async with slots:
+                return await self.searcher.search_batch(
+                    chunk,
+                    limit=limit,
+                    score_threshold=0.85,
+                    filters={"metadata.namespace": self.namespace},
+                    payload_fields=["fact"]
+                )
+
+        tasks = [asyncio.ensure_future(expand_chunk(chunk)) for chunk in chunks]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(
+                f"SEMANTIC_EXPANSION_HOP_TRUNCATED | Dropped Chunks: {len(pending)}/{len(tasks)}"
+            )
+
+        batches: List[List[Any]] = []
+        for task in tasks:
+            if task in done and task.exception() is None:
+                batches.extend(task.result())
+            elif task in done:
+                logger.warning(f"SEMANTIC_EXPANSION_BYPASS | Reason: {str(task.exception())}")
+        return batches
+
+    async def get_related_concepts(
+        self,
+        concepts: List[str],
+        hops: int = 1,
+        limit_per_concept: int = 2,
+        max_concepts: int = 64,
+        hop_deadline: Optional[float] = None
+    ) -> List[str]:
+        deadline = hop_deadline or self.expansion_hop_deadline
+        visited = set()
+        frontier: List[str] = []
         for concept in concepts:
-            facts = await self.query(concept, limit=2)
-            results.extend(facts)
-        return list(set(results))
\ No newline at end of file
+            key = " ".join(concept.lower().split())
+            if key and key not in visited:
+                visited.add(key)
+                frontier.append(concept)
+
+        seeds = set(visited)
+        facts: Dict[str, None] = {}
+        for hop in range(hops):
+            if not frontier:
+                break
+
+            next_frontier: List[str] = []
+            for results in await self._expand_hop(frontier, limit_per_concept, deadline):
+                for res in results:
+                    fact = res["payload"]["fact"]
+                    key = " ".join(fact.lower().split())
+                    if fact in facts or key in seeds:
+                        continue
+                    facts[fact] = None
+                    if key not in visited and len(visited) < max_concepts:
+                        visited.add(key)
+                        next_frontier.append(fact)
+
+            logger.info(
+                f"SEMANTIC_EXPANSION_HOP | Hop: {hop + 1} | Frontier: {len(frontier)} | "
+                f"Facts: {len(facts)} | Next: {len(next_frontier)}"
+            )
+            frontier = next_frontier
+
+        return list(facts)
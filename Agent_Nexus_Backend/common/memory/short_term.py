@@ -1,61 +1,105 @@
+import os
 import json
+from datetime import datetime
 from typing import List, Dict, Any, Optional
-from common.config.secrets import secrets
 from common.config.logging import logger
+from common.config.redis_pool import redis_pool
 from common.schemas.errors import AppError, ErrorCategory
+from common.memory.near_cache import stm_near_cache
+from common.memory.recall_cache import recall_cache
 
 try:
-    import redis.asyncio as redis
+    import msgpack
 except ImportError:
-    import redis
+    msgpack = None
 
-class ShortTermMemory:
-    _redis_client: Optional[redis.Redis] = None
+# Leading byte of binary entries; legacy JSON entries always start with "{".
+_SCHEMA_V1 = b"\x01"
 
-    def __init__(self, trace_id: str, ttl: int = 3600):
+class ShortTermMemory:
+    def __init__(self, trace_id: str, ttl: int = 3600, max_entries: Optional[int] = None):
         self.trace_id = trace_id
         self.ttl = ttl
+        self.max_entries = max_entries or int(os.getenv("STM_MAX_ENTRIES", 200))
         self.key = f"stm:{self.trace_id}"
-        self._ensure_client()
 
-    def _ensure_client(self):
-        if ShortTermMemory._redis_client is None:
-            ShortTermMemory._redis_client = redis.from_url(
-                secrets.REDIS_URL, 
-                encoding="utf-8", 
-                decode_responses=True
-            )
+    @property
+    def _redis_client(self):
+        return redis_pool.client(decode_responses=False)
+
+    @staticmethod
+    def encode_entry(content: Any, timestamp: Optional[str] = None) -> bytes:
+        stamp = timestamp or datetime.utcnow().isoformat()
+        if msgpack is not None:
+            packed = msgpack.packb({"d": content, "t": stamp}, default=str, use_bin_type=True)
+            return _SCHEMA_V1 + packed
+        return json.dumps({"data": content, "timestamp": stamp}, default=str).encode("utf-8")
+
+    @staticmethod
+    def decode_entry(raw: bytes) -> Dict[str, Any]:
+        if raw[:1] == _SCHEMA_V1:
+            if msgpack is None:
+                raise RuntimeError("STM_MSGPACK_UNAVAILABLE")
+            fields = msgpack.unpackb(raw[1:], raw=False)
+            return {"data": fields["d"], "timestamp": fields["t"]}
+        return json.loads(raw)
 
     async def append(self, content: Any):
         try:
-            entry = {
-                "data": content,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            serialized = json.dumps(entry)
             async with self._redis_client.pipeline(transaction=True) as pipe:
-                await pipe.rpush(self.key, serialized)
+                await pipe.rpush(self.key, self.encode_entry(content))
+                await pipe.ltrim(self.key, -self.max_entries, -1)
                 await pipe.expire(self.key, self.ttl)
                 await pipe.execute()
         except Exception as e:
             logger.error(f"STM_APPEND_FAILURE | Trace: {self.trace_id} | Error: {str(e)}")
+        finally:
+            # Invalidating after the write also discards any read that raced with it.
+            await self._invalidate()
+
+    async def get_range(self, start: int, end: int) -> List[Dict[str, Any]]:
+        await stm_near_cache.ensure_started()
+        if not stm_near_cache.active:
+            raw_items = await self._redis_client.lrange(self.key, start, end)
+            return [self.decode_entry(item) for item in raw_items]
+
+        # Hot sessions are cached whole; the ring buffer cap keeps that bounded.
+        cached = stm_near_cache.get(self.key)
+        if cached is None:
+            epoch = stm_near_cache.epoch(self.key)
+            cached = await self._redis_client.lrange(self.key, 0, -1)
+            stm_near_cache.put(self.key, cached, epoch)
+        return [self.decode_entry(item) for item in stm_near_cache.slice(cached, start, end)]
 
     async def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
         try:
-            raw_items = await self._redis_client.lrange(self.key, -limit, -1)
-            return [json.loads(item) for item in raw_items]
+            return await self.get_range(-limit, -1)
         except Exception as e:
             logger.error(f"STM_RETRIEVAL_FAILURE | Trace: {self.trace_id} | Error: {str(e)}")
             return []
 
     async def get_full_context(self) -> List[Dict[str, Any]]:
         try:
-            raw_items = await self._redis_client.lrange(self.key, 0, -1)
-            return [json.loads(item) for item in raw_items]
+            return await self.get_range(0, -1)
         except Exception as e:
             logger.error(f"STM_FULL_RETRIEVAL_FAILURE | Trace: {self.trace_id} | Error: {str(e)}")
             return []
 
+    async def length(self) -> int:
+        try:
+            return await self._redis_client.llen(self.key)
+        except Exception as e:
+            logger.error(f"STM_LENGTH_FAILURE | Trace: {self.trace_id} | Error: {str(e)}")
+            return 0
+
+    async def _invalidate(self):
+        stm_near_cache.invalidate(self.key)
+        # Recalls cached for this trace embed its history, so every write must retire them.
+        await recall_cache.invalidate_trace(self.trace_id)
+
+    async def release(self):
+        stm_near_cache.invalidate(self.key)
+
     async def clear(self) -> bool:
         try:
             await self._redis_client.delete(self.key)
@@ -63,21 +107,17 @@ class ShortTermMemory:
         except Exception as e:
             logger.error(f"STM_CLEAR_FAILURE | Trace: {self.trace_id} | Error: {str(e)}")
             return False
+        finally:
+            await self._invalidate()
 
     async def update_last_entry(self, updated_content: Any):
         try:
-            async with self._redis_client.pipeline(transaction=True) as pipe:
-                await pipe.lpop(self.key, count=-1)
-                entry = {
-                    "data": updated_content,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                await pipe.rpush(self.key, json.dumps(entry))
-                await pipe.execute()
+            await self._redis_client.lset(self.key, -1, self.encode_entry(updated_content))
         except Exception as e:
             logger.error(f"STM_UPDATE_FAILURE | Trace: {self.trace_id} | Error: {str(e)}")
+        finally:
+            await self._invalidate()
 
     @classmethod
     async def close_connection(cls):
-        if cls._redis_client:
-            await cls._redis_client.close()
\ No newline at end of file
+        await redis_pool.close()
@@ -1,8 +1,16 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+from common.vector.cache import EmbeddingCache, RetrievalCache, embedding_cache, retrieval_cache
+from common.vector.batching import EmbeddingCoalescer, TokenBatcher
 from common.vector.embeddings import EmbeddingGenerator
-from common.vector.indexing import VectorIndexer
+from common.vector.client import VectorClientRegistry, vector_clients
+from common.vector.indexing import VectorIndexer, UpsertReport
+from common.vector.keyword import BM25Index
 from common.vector.search import VectorSearcher
+from common.vector.results import SearchHit
+from common.vector.local_index import LocalVectorIndex
 from common.vector.ranking import ResultRanker
+from common.vector.profiles import EmbeddingProfile
+from common.vector.per_collection import enabled_collections
 
 class VectorManifest:
     _instance = None
@@ -10,35 +18,136 @@ class VectorManifest:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(VectorManifest, cls).__new__(cls)
-            cls._instance.embeddings = EmbeddingGenerator()
-            cls._instance.indexer = VectorIndexer()
-            cls._instance.searcher = VectorSearcher()
+            cls._instance.clients = vector_clients
+            cls._instance.embeddings = vector_clients.get_embedder()
             cls._instance.ranker = ResultRanker()
+            cls._instance.cache = retrieval_cache
+            cls._instance._indexers = {}
+            cls._instance._searchers = {}
+            cls._instance.local_collections = enabled_collections("LOCAL_VECTOR_COLLECTIONS")
         return cls._instance
 
+    def indexer(self, collection: str) -> Union[VectorIndexer, LocalVectorIndex]:
+        if collection in self.local_collections:
+            return LocalVectorIndex.for_collection(collection)
+        if collection not in self._indexers:
+            self._indexers[collection] = VectorIndexer(collection_name=collection)
+        return self._indexers[collection]
+
+    def searcher(self, collection: str) -> Union[VectorSearcher, LocalVectorIndex]:
+        if collection in self.local_collections:
+            return LocalVectorIndex.for_collection(collection)
+        if collection not in self._searchers:
+            self._searchers[collection] = VectorSearcher(collection_name=collection)
+        return self._searchers[collection]
+
     async def semantic_retrieval(
         self, 
         query: str, 
         collection: str, 
         top_k: int = 10,
-        filters: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
-        query_vector = await self.embeddings.generate(query)
-        raw_results = await self.searcher.query(
-            vector=query_vector,
-            collection=collection,
+        filters: Optional[Dict[str, Any]] = None,
+        diversify: bool = False,
+        mmr_lambda: float = 0.5,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        timestamp_key: str = "created_at"
+    ) -> List[SearchHit]:
+        cache_key = self.cache.make_key(
+            collection,
+            query,
+            filters=filters,
+            top_k=top_k,
+            diversify=diversify,
+            mmr_lambda=mmr_lambda,
+            payload_fields=payload_fields,
+            exclude_fields=exclude_fields,
+            timestamp_key=timestamp_key
+        )
+        generation, cached = await self.cache.lookup(collection, cache_key)
+        if cached is not None:
+            return [SearchHit.from_dict(row) for row in cached]
+
+        if payload_fields:
+            # The ranker blends recency, so the timestamp must survive projection.
+            payload_fields = [*payload_fields, timestamp_key, f"metadata.{timestamp_key}"]
+
+        results = [
+            hit if isinstance(hit, SearchHit) else SearchHit.from_dict(hit, hit.get("trace_id"))
+            for hit in await self._retrieve(
+                query, collection, top_k, filters, diversify, mmr_lambda,
+                payload_fields, exclude_fields, timestamp_key
+            )
+        ]
+        if results:
+            # Cached rows are shared across requests, so they carry no caller's trace id.
+            rows = [{k: v for k, v in hit.to_dict().items() if k != "trace_id"} for hit in results]
+            await self.cache.store(cache_key, generation, rows)
+        return results
+
+    async def _retrieve(
+        self,
+        query: str,
+        collection: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        diversify: bool,
+        mmr_lambda: float,
+        payload_fields: Optional[List[str]],
+        exclude_fields: Optional[List[str]],
+        timestamp_key: str
+    ) -> List[Union[SearchHit, Dict[str, Any]]]:
+        searcher = self.searcher(collection)
+
+        if not diversify:
+            raw_results = await searcher.search(
+                query,
+                limit=top_k * 2,
+                filters=filters,
+                payload_fields=payload_fields,
+                exclude_fields=exclude_fields
+            )
+            ranked_results = self.ranker.rerank(raw_results, timestamp_key=timestamp_key)
+            return ranked_results[:top_k]
+
+        query_vector = await self.embeddings.generate_single(query)
+        raw_results = await searcher.search_by_vector(
+            query_vector,
             limit=top_k * 2,
-            filters=filters
+            filters=filters,
+            with_vectors=True,
+            payload_fields=payload_fields,
+            exclude_fields=exclude_fields
+        )
+        diverse_results = self.ranker.maximal_marginal_relevance(
+            EmbeddingProfile.for_collection(collection).project(query_vector),
+            self.ranker.rerank(raw_results, timestamp_key=timestamp_key),
+            top_k=top_k,
+            lambda_mult=mmr_lambda
         )
-        ranked_results = self.ranker.rerank(query, raw_results)
-        return ranked_results[:top_k]
+        for result in diverse_results:
+            result.pop("vector", None)
+        return diverse_results
 
 vector_manifest = VectorManifest()
 
 __all__ = [
     "vector_manifest",
+    "vector_clients",
+    "VectorClientRegistry",
     "EmbeddingGenerator",
+    "EmbeddingProfile",
+    "EmbeddingCache",
+    "embedding_cache",
+    "RetrievalCache",
+    "retrieval_cache",
+    "EmbeddingCoalescer",
+    "TokenBatcher",
     "VectorIndexer",
+    "UpsertReport",
     "VectorSearcher",
+    "SearchHit",
+    "BM25Index",
+    "LocalVectorIndex",
     "ResultRanker"
 ]
\ No newline at end of file
@@ -0,0 +1,144 @@
+import os
+import asyncio
+import uuid
+from typing import List, Dict, Any, Optional, Set, Tuple
+from common.config.logging import logger
+from common.ai_sdk.tokenization import TokenCounter
+
+class EmbeddingCoalescer:
+    def __init__(
+        self,
+        generator: Any,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.generator = generator
+        if window_ms is None:
+            window_ms = float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS", 5))
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_COALESCE_MAX_BATCH", 256))
+        self._pending: List[Tuple[str, asyncio.Future, Optional[str]]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self.requests_received = 0
+        self.batches_sent = 0
+
+    async def submit(self, text: str, trace_id: Optional[str] = None) -> List[float]:
+        if not text.strip():
+            return []
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, trace_id))
+        self.requests_received += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future, Optional[str]]]):
+        caller_ids = list(dict.fromkeys(trace_id for _, _, trace_id in batch if trace_id))
+        # A batch from a single trace keeps that trace's id so cost tracking stays attributed.
+        t_id = caller_ids[0] if len(caller_ids) == 1 else f"coalesced-{uuid.uuid4()}"
+        unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+
+        try:
+            vectors = await self.generator.generate(unique_texts, trace_id=t_id)
+            by_text = dict(zip(unique_texts, vectors))
+            self.batches_sent += 1
+
+            logger.info(
+                f"EMBEDDING_COALESCE_FLUSH | Trace: {t_id} | Callers: {len(batch)} | "
+                f"Unique: {len(unique_texts)} | Traces: {','.join(caller_ids) or '-'}"
+            )
+
+            for text, future, _ in batch:
+                if not future.done():
+                    future.set_result(by_text.get(text, []))
+        except Exception as e:
+            logger.error(f"EMBEDDING_COALESCE_FAILED | Trace: {t_id} | Error: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_received": self.requests_received,
+            "batches_sent": self.batches_sent,
+            "pending": len(self._pending),
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size
+        }
+
+    async def drain(self):
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+class TokenBatcher:
+    def __init__(
+        self,
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None,
+        max_item_tokens: Optional[int] = None,
+        model: str = "text-embedding-3-small"
+    ):
+        self.max_batch_tokens = (
+            max_batch_tokens or int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", 100000))
+        )
+        self.max_batch_items = max_batch_items or int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", 512))
+        self.max_item_tokens = min(
+            max_item_tokens or int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", 8191)),
+            self.max_batch_tokens
+        )
+        self.model = model
+        self.counter = TokenCounter()
+
+    def measure(self, text: str) -> int:
+        tokens = self.counter.count_tokens(text, model=self.model)
+        if tokens > self.max_item_tokens:
+            raise ValueError(
+                f"EMBEDDING_INPUT_TOO_LARGE: {tokens} tokens exceeds the "
+                f"{self.max_item_tokens} token limit for {self.model}; "
+                f"chunk the text before indexing"
+            )
+        return tokens
+
+    def split(self, texts: List[str], sizes: Optional[List[int]] = None) -> List[List[int]]:
+        # Every text is measured before any batch is built, so oversized inputs are caught up front.
+        if sizes is None:
+            sizes = [self.measure(text) for text in texts]
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, tokens in enumerate(sizes):
+            if current and (
+                current_tokens + tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_items
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+
+            current.append(index)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
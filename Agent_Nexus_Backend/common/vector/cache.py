@@ -0,0 +1,144 @@
+import os
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from common.config.logging import logger
+from common.config.redis_pool import redis_pool
+from common.config.versioned_cache import VersionedCache
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[int] = None,
+        namespace: str = "emb"
+    ):
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+        self.ttl = ttl or int(os.getenv("EMBEDDING_CACHE_TTL", 7 * 86400))
+        self.namespace = namespace
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def make_key(self, model: str, dimensions: Optional[int], text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{model}:{dimensions}:{digest}"
+
+    def _get_redis(self):
+        return redis_pool.client(decode_responses=False)
+
+    def _remember(self, key: str, vector: List[float]):
+        self._local[key] = vector
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+
+        for key in unique_keys:
+            vector = self._local.get(key)
+            if vector is None:
+                missing.append(key)
+                continue
+            self._local.move_to_end(key)
+            found[key] = vector
+        self.local_hits += len(found)
+
+        client = self._get_redis()
+        if missing and client is not None:
+            try:
+                raw_values = await client.mget(missing)
+                for key, raw in zip(missing, raw_values):
+                    if raw is None:
+                        continue
+                    vector = array("f")
+                    vector.frombytes(raw)
+                    found[key] = vector.tolist()
+                    self._remember(key, found[key])
+                    self.remote_hits += 1
+            except Exception as e:
+                logger.warning(f"EMBEDDING_CACHE_REMOTE_READ_FAILED | Error: {str(e)}")
+
+        self.misses += len(unique_keys) - len(found)
+        return found
+
+    async def set_many(self, entries: Dict[str, List[float]]):
+        if not entries:
+            return
+
+        for key, vector in entries.items():
+            self._remember(key, vector)
+
+        client = self._get_redis()
+        if client is None:
+            return
+
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, vector in entries.items():
+                    pipe.set(key, array("f", vector).tobytes(), ex=self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"EMBEDDING_CACHE_REMOTE_WRITE_FAILED | Error: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.remote_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.local_hits + self.remote_hits) / lookups, 4) if lookups else 0.0
+            ),
+            "local_size": len(self._local),
+            "local_capacity": self.max_entries
+        }
+
+    def clear_local(self):
+        self._local.clear()
+
+class RetrievalCache(VersionedCache):
+    label = "RETRIEVAL_CACHE"
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        namespace: str = "vret"
+    ):
+        super().__init__(
+            namespace,
+            ttl or int(os.getenv("RETRIEVAL_CACHE_TTL", 600)),
+            enabled=os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+        )
+
+    def _generation_key(self, collection: str) -> str:
+        return f"{self.namespace}:gen:{collection}"
+
+    def make_key(self, collection: str, query: str, **params: Any) -> str:
+        return self._digest_key(collection, {"q": EmbeddingCache.normalize(query), **params})
+
+    async def lookup(self, collection: str, key: str) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+        (generation,), results = await self._lookup([self._generation_key(collection)], key)
+        return generation, results
+
+    async def store(self, key: str, generation: int, results: List[Dict[str, Any]]):
+        rows = [r.to_dict() if hasattr(r, "to_dict") else r for r in results]
+        await self._store(key, (generation,), rows)
+
+    async def generation(self, collection: str) -> Optional[int]:
+        return await self._read_version(self._generation_key(collection))
+
+    async def bump_generation(self, collection: str) -> Optional[int]:
+        return await self._bump(self._generation_key(collection))
+
+embedding_cache = EmbeddingCache()
+retrieval_cache = RetrievalCache()
@@ -0,0 +1,222 @@
+import os
+import asyncio
+from typing import Dict, Any, Optional, Set
+import httpx
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+from common.config.logging import logger
+from common.vector.embeddings import EmbeddingGenerator
+from common.vector.profiles import DENSE_VECTOR, FULL_VECTOR
+from common.vector.sparse import SparseEncoder, SPARSE_VECTOR
+
+class VectorClientRegistry:
+    _instance: Optional['VectorClientRegistry'] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(VectorClientRegistry, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.url = os.getenv("QDRANT_URL", "http://localhost:6333")
+        self.api_key = os.getenv("QDRANT_API_KEY")
+        self.prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+        self.grpc_port = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+        self.timeout = int(os.getenv("QDRANT_TIMEOUT", 30))
+        self.max_connections = int(os.getenv("QDRANT_MAX_CONNECTIONS", 100))
+        self.max_keepalive = int(os.getenv("QDRANT_MAX_KEEPALIVE", 20))
+        self.keepalive_expiry = float(os.getenv("QDRANT_KEEPALIVE_EXPIRY", 30))
+        self.quantization = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+        self.hnsw_m = int(os.getenv("QDRANT_HNSW_M", 0)) or None
+        self.hnsw_ef_construct = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", 0)) or None
+        self.vectors_on_disk = os.getenv("QDRANT_VECTORS_ON_DISK", "false").lower() == "true"
+
+        self._client: Optional[AsyncQdrantClient] = None
+        self._embedders: Dict[str, EmbeddingGenerator] = {}
+        self._known_collections: Optional[Set[str]] = None
+        self._sparse_ready: Dict[str, bool] = {}
+        self._collections_lock = asyncio.Lock()
+        self._initialized = True
+
+    def get_client(self) -> AsyncQdrantClient:
+        if self._client is None:
+            self._client = AsyncQdrantClient(
+                url=self.url,
+                api_key=self.api_key,
+                prefer_grpc=self.prefer_grpc,
+                grpc_port=self.grpc_port,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+            logger.info(
+                f"VECTOR_CLIENT_CREATED | URL: {self.url} | gRPC: {self.prefer_grpc} | "
+                f"Pool: {self.max_connections}"
+            )
+        return self._client
+
+    def get_embedder(
+        self,
+        model: str = "text-embedding-3-small",
+        dimensions: Optional[int] = None
+    ) -> EmbeddingGenerator:
+        key = f"{model}:{dimensions}"
+        if key not in self._embedders:
+            self._embedders[key] = EmbeddingGenerator(model=model, dimensions=dimensions)
+        return self._embedders[key]
+
+    def collection_config(
+        self,
+        size: int,
+        distance: models.Distance = models.Distance.COSINE,
+        quantization: Optional[str] = None,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        on_disk: Optional[bool] = None,
+        full_size: Optional[int] = None,
+        sparse: bool = False
+    ) -> Dict[str, Any]:
+        quantization = (quantization or self.quantization).lower()
+        on_disk = self.vectors_on_disk if on_disk is None else on_disk
+        vectors_config = models.VectorParams(size=size, distance=distance, on_disk=on_disk)
+        if full_size:
+            # Full-dimension copies are only read when rescoring, so they always live on disk.
+            vectors_config = {
+                DENSE_VECTOR: vectors_config,
+                FULL_VECTOR: models.VectorParams(size=full_size, distance=distance, on_disk=True)
+            }
+        config: Dict[str, Any] = {"vectors_config": vectors_config}
+        if sparse:
+            config["sparse_vectors_config"] = self.sparse_vectors_config()
+
+        m = hnsw_m or self.hnsw_m
+        ef_construct = hnsw_ef_construct or self.hnsw_ef_construct
+        if m or ef_construct:
+            config["hnsw_config"] = models.HnswConfigDiff(m=m, ef_construct=ef_construct)
+
+        # Quantized codes stay in RAM; the on-disk originals are only read for rescoring.
+        if quantization == "scalar":
+            config["quantization_config"] = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        elif quantization == "binary":
+            config["quantization_config"] = models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        elif quantization != "none":
+            raise ValueError(f"UNSUPPORTED_QUANTIZATION | Mode: {quantization}")
+
+        return config
+
+    def sparse_vectors_config(self) -> Dict[str, models.SparseVectorParams]:
+        return {
+            SPARSE_VECTOR: models.SparseVectorParams(
+                index=models.SparseIndexParams(on_disk=False)
+            )
+        }
+
+    async def known_collections(self, refresh: bool = False) -> Set[str]:
+        if self._known_collections is not None and not refresh:
+            return self._known_collections
+
+        async with self._collections_lock:
+            if self._known_collections is None or refresh:
+                response = await self.get_client().get_collections()
+                self._known_collections = {c.name for c in response.collections}
+        return self._known_collections
+
+    async def collection_exists(self, name: str) -> bool:
+        return name in await self.known_collections()
+
+    async def ensure_collection(self, name: str, **create_kwargs: Any) -> bool:
+        if await self.collection_exists(name):
+            return False
+
+        async with self._collections_lock:
+            if self._known_collections is not None and name in self._known_collections:
+                return False
+            try:
+                await self.get_client().create_collection(collection_name=name, **create_kwargs)
+            except Exception:
+                self._known_collections = None
+                raise
+            # A failed create by another caller may have reset the cache while this one waited.
+            if self._known_collections is not None:
+                self._known_collections.add(name)
+            if "sparse_vectors_config" in create_kwargs:
+                self._sparse_ready[name] = True
+
+        logger.info(f"VECTOR_COLLECTION_CREATED | Name: {name}")
+        return True
+
+    async def ensure_sparse_vectors(self, name: str) -> bool:
+        if name in self._sparse_ready:
+            return self._sparse_ready[name]
+
+        async with self._collections_lock:
+            if name in self._sparse_ready:
+                return self._sparse_ready[name]
+
+            sparse_vectors_config = self.sparse_vectors_config()
+            client = self.get_client()
+            info = await client.get_collection(collection_name=name)
+            if set(sparse_vectors_config) - set(info.config.params.sparse_vectors or {}):
+                # Collections created before sparse was enabled lack the named sparse vector.
+                try:
+                    await client.update_collection(
+                        collection_name=name,
+                        sparse_vectors_config=sparse_vectors_config
+                    )
+                    info = await client.get_collection(collection_name=name)
+                except Exception as e:
+                    logger.warning(
+                        f"VECTOR_SPARSE_CONFIG_UPDATE_FAILED | Name: {name} | Error: {str(e)}"
+                    )
+
+            ready = not set(sparse_vectors_config) - set(info.config.params.sparse_vectors or {})
+            self._sparse_ready[name] = ready
+
+        if ready:
+            logger.info(f"VECTOR_SPARSE_CONFIG_READY | Name: {name}")
+        else:
+            logger.error(
+                f"VECTOR_SPARSE_CONFIG_MISSING | Name: {name} | "
+                "Action: Recreate the collection to enable sparse vectors"
+            )
+        return ready
+
+    async def delete_collection(self, name: str) -> bool:
+        async with self._collections_lock:
+            result = await self.get_client().delete_collection(collection_name=name)
+            if self._known_collections is not None:
+                self._known_collections.discard(name)
+            self._sparse_ready.pop(name, None)
+        logger.info(f"VECTOR_COLLECTION_DELETED | Name: {name}")
+        return result
+
+    def invalidate_collections(self):
+        self._known_collections = None
+
+    async def close(self):
+        await SparseEncoder.close_all()
+        # Callers resolve the client through get_client() per operation, so a later call
+        # transparently reconnects.
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        self._known_collections = None
+        self._sparse_ready.clear()
+        logger.info("VECTOR_CLIENT_RELEASED")
+
+vector_clients = VectorClientRegistry()
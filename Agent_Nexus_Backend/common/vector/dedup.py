@@ -0,0 +1,137 @@
+import os
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple, Union
+from common.config.logging import logger
+from common.vector.keyword import tokenize
+from common.vector.per_collection import WarmIndex
+
+_SIGNATURE_BITS = 64
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    tokens = tokenize(text)
+    if len(tokens) >= shingle_size:
+        shingles = [
+            " ".join(tokens[i:i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        ]
+    else:
+        shingles = tokens or [text.strip().lower()]
+
+    weights = [0] * _SIGNATURE_BITS
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(_SIGNATURE_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature
+
+class NearDuplicateDetector(WarmIndex):
+    enabled_env = "DEDUP_COLLECTIONS"
+    warm_fields = ["dedup"]
+    warm_label = "DEDUP"
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_distance: Optional[int] = None,
+        shingle_size: int = 3
+    ):
+        self.collection_name = collection_name
+        if max_distance is None:
+            max_distance = int(os.getenv("DEDUP_MAX_DISTANCE", 3))
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        # Pigeonhole banding: signatures within max_distance bits agree on at least one band.
+        self.bands = self.max_distance + 1
+        self._band_width = -(-_SIGNATURE_BITS // self.bands)
+        self._reset()
+        self._init_warm_state()
+
+    def _reset(self):
+        self._buckets: List[Dict[Tuple[str, int], List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, Tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> int:
+        return simhash(text, self.shingle_size)
+
+    def _band_keys(self, signature: int, scope: str) -> List[Tuple[str, int]]:
+        band_mask = (1 << self._band_width) - 1
+        return [
+            (scope, signature >> (band * self._band_width) & band_mask)
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: int, scope: str = "") -> Optional[str]:
+        for band, key in enumerate(self._band_keys(signature, scope)):
+            for point_id in self._buckets[band].get(key, ()):
+                _, candidate = self._signatures[point_id]
+                if bin(candidate ^ signature).count("1") <= self.max_distance:
+                    return point_id
+        return None
+
+    def add(self, point_id: Union[str, int], signature: int, scope: str = ""):
+        key = str(point_id)
+        self.remove(key)
+        self._signatures[key] = (scope, signature)
+        for band, band_key in enumerate(self._band_keys(signature, scope)):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def add_payload(self, point_id: Union[str, int], payload: Dict[str, Any]):
+        entry = payload.get("dedup")
+        if entry:
+            self.add(point_id, int(entry["signature"], 16), entry.get("scope", ""))
+
+    def remove(self, point_id: Union[str, int]):
+        key = str(point_id)
+        entry = self._signatures.pop(key, None)
+        if entry is None:
+            return
+        scope, signature = entry
+        for band, band_key in enumerate(self._band_keys(signature, scope)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def screen(
+        self,
+        point_ids: List[Union[str, int]],
+        texts: List[str],
+        scope: str = ""
+    ) -> Tuple[List[int], Dict[str, str], List[int]]:
+        kept: List[int] = []
+        duplicates: Dict[str, str] = {}
+        signatures: List[int] = []
+        pending = NearDuplicateDetector(self.collection_name, self.max_distance, self.shingle_size)
+
+        for position, (point_id, text) in enumerate(zip(point_ids, texts)):
+            signature = self.signature(text)
+            signatures.append(signature)
+            existing = self.find(signature, scope) or pending.find(signature, scope)
+            if existing is not None and existing != str(point_id):
+                duplicates[str(point_id)] = existing
+                continue
+            pending.add(point_id, signature, scope)
+            kept.append(position)
+
+        if duplicates:
+            logger.info(
+                f"DEDUP_SCREENED | Collection: {self.collection_name} | Scope: {scope or '-'} | "
+                f"Kept: {len(kept)} | Duplicates: {len(duplicates)}"
+            )
+        return kept, duplicates, signatures
+
+    def _load_point(self, point: Any) -> bool:
+        if str(point.id) in self._signatures or not (point.payload or {}).get("dedup"):
+            return False
+        self.add_payload(point.id, point.payload)
+        return True
@@ -4,35 +4,74 @@ import uuid
 from typing import List, Optional, Union
 from openai import AsyncOpenAI, RateLimitError, APIConnectionError, APIStatusError
 from common.config.logging import logger
+from common.vector.cache import EmbeddingCache, embedding_cache
+from common.vector.batching import EmbeddingCoalescer
 
 class EmbeddingGenerator:
     def __init__(
-        self, 
-        model: str = "text-embedding-3-small", 
+        self,
+        model: str = "text-embedding-3-small",
         dimensions: Optional[int] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        cache: Optional[EmbeddingCache] = None,
+        use_cache: bool = True,
+        coalesce: Optional[bool] = None,
+        coalesce_window_ms: Optional[float] = None,
+        coalesce_max_batch: Optional[int] = None
     ):
         self.model = model
         self.dimensions = dimensions or (1536 if "small" in model else 3072)
         self.max_retries = max_retries
+        self.cache = (cache or embedding_cache) if use_cache else None
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY_MISSING")
         self.client = AsyncOpenAI(api_key=self.api_key)
 
+        if coalesce is None:
+            coalesce = os.getenv("EMBEDDING_COALESCE_ENABLED", "false").lower() == "true"
+        self.coalescer = EmbeddingCoalescer(
+            self,
+            window_ms=coalesce_window_ms,
+            max_batch_size=coalesce_max_batch
+        ) if coalesce else None
+
     async def generate(
-        self, 
-        input_data: Union[str, List[str]], 
+        self,
+        input_data: Union[str, List[str]],
         trace_id: Optional[str] = None
     ) -> List[List[float]]:
         t_id = trace_id or str(uuid.uuid4())
         texts = [input_data] if isinstance(input_data, str) else input_data
-        
+
         if not texts:
             return []
 
         cleaned_texts = [t.replace("\n", " ").strip() for t in texts if t.strip()]
-        
+
+        if not cleaned_texts:
+            return []
+
+        if self.cache is None:
+            return await self._request_embeddings(cleaned_texts, t_id)
+
+        keys = [self.cache.make_key(self.model, self.dimensions, t) for t in cleaned_texts]
+        vectors = await self.cache.get_many(keys)
+
+        pending = {key: text for key, text in zip(keys, cleaned_texts) if key not in vectors}
+        if pending:
+            fresh = await self._request_embeddings(list(pending.values()), t_id)
+            fresh_vectors = dict(zip(pending.keys(), fresh))
+            await self.cache.set_many(fresh_vectors)
+            vectors.update(fresh_vectors)
+
+        logger.info(
+            f"EMBEDDING_CACHE_LOOKUP | Trace: {t_id} | Requested: {len(cleaned_texts)} | "
+            f"Upstream: {len(pending)}"
+        )
+        return [vectors[key] for key in keys]
+
+    async def _request_embeddings(self, cleaned_texts: List[str], t_id: str) -> List[List[float]]:
         for attempt in range(self.max_retries):
             try:
                 params = {
@@ -43,12 +82,12 @@ class EmbeddingGenerator:
                     params["dimensions"] = self.dimensions
 
                 response = await self.client.embeddings.create(**params)
-                
+
                 logger.info(
                     f"EMBEDDING_GEN_SUCCESS | Trace: {t_id} | Model: {self.model} | "
                     f"Count: {len(cleaned_texts)} | Attempt: {attempt + 1}"
                 )
-                
+
                 return [data.embedding for data in response.data]
 
             except RateLimitError:
@@ -57,17 +96,22 @@ class EmbeddingGenerator:
                     raise
                 wait_time = (2 ** attempt)
                 await asyncio.sleep(wait_time)
-            
+
             except (APIConnectionError, APIStatusError) as e:
                 if attempt == self.max_retries - 1:
                     logger.error(f"EMBEDDING_API_ERROR | Trace: {t_id} | Error: {str(e)}")
                     raise
                 await asyncio.sleep(1)
-            
+
             except Exception as e:
                 logger.critical(f"EMBEDDING_UNEXPECTED_FAILURE | Trace: {t_id} | Error: {str(e)}")
                 raise
 
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache else {}
+
     async def generate_single(self, text: str, trace_id: Optional[str] = None) -> List[float]:
+        if self.coalescer is not None:
+            return await self.coalescer.submit(text, trace_id=trace_id)
         result = await self.generate([text], trace_id=trace_id)
-        return result[0] if result else []
\ No newline at end of file
+        return result[0] if result else []
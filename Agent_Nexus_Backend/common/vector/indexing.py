@@ -1,91 +1,433 @@
 import os
 import uuid
 import asyncio
-from typing import List, Dict, Any, Optional, Union
-from qdrant_client import AsyncQdrantClient
+from typing import List, Dict, Any, Optional, Union, Tuple
 from qdrant_client.http import models
 from common.config.logging import logger
-from common.vector.embeddings import EmbeddingGenerator
+from common.vector.batching import TokenBatcher
+from common.vector.client import vector_clients
+from common.vector.cache import retrieval_cache
+from common.vector.keyword import BM25Index
+from common.vector.dedup import NearDuplicateDetector
+from common.vector.profiles import EmbeddingProfile
+from common.vector.sparse import SparseEncoder, SPARSE_VECTOR
+
+class UpsertBatch:
+    def __init__(
+        self,
+        index: int,
+        point_ids: List[Union[str, int]],
+        texts: List[str],
+        payloads: List[Dict[str, Any]]
+    ):
+        self.index = index
+        self.point_ids = point_ids
+        self.texts = texts
+        self.payloads = payloads
+        self.vectors: Optional[List[List[float]]] = None
+        self.sparse_vectors: Optional[List[models.SparseVector]] = None
+        self.replaced_texts: List[str] = []
+        self.success = False
+        self.retryable = True
+        self.attempts = 0
+        self.error: Optional[str] = None
+
+    def release(self):
+        self.texts = []
+        self.payloads = []
+        self.vectors = None
+        self.sparse_vectors = None
+        self.replaced_texts = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batch": self.index,
+            "count": len(self.point_ids),
+            "success": self.success,
+            "attempts": self.attempts,
+            "error": self.error
+        }
+
+class UpsertReport:
+    def __init__(
+        self,
+        trace_id: str,
+        batches: List[UpsertBatch],
+        duplicates: Optional[Dict[str, str]] = None
+    ):
+        self.trace_id = trace_id
+        self.batches = batches
+        self.duplicates = duplicates or {}
+
+    @property
+    def succeeded(self) -> List[UpsertBatch]:
+        return [b for b in self.batches if b.success]
+
+    @property
+    def failed(self) -> List[UpsertBatch]:
+        return [b for b in self.batches if not b.success]
+
+    @property
+    def upserted_count(self) -> int:
+        return sum(len(b.point_ids) for b in self.succeeded)
+
+    @property
+    def failed_ids(self) -> List[Union[str, int]]:
+        return [pid for b in self.failed for pid in b.point_ids]
+
+    def __bool__(self) -> bool:
+        return not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "upserted": self.upserted_count,
+            "failed": len(self.failed_ids),
+            "duplicates": len(self.duplicates),
+            "batches": [b.to_dict() for b in self.batches]
+        }
 
 class VectorIndexer:
     def __init__(
-        self, 
+        self,
         collection_name: str,
-        vector_size: int = 1536,
-        distance_metric: str = "Cosine"
+        vector_size: Optional[int] = None,
+        distance_metric: str = "Cosine",
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_attempts: int = 3,
+        quantization: Optional[str] = None,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        on_disk: Optional[bool] = None
     ):
-        self.url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.api_key = os.getenv("QDRANT_API_KEY")
         self.collection_name = collection_name
-        self.vector_size = vector_size
+        self.profile = EmbeddingProfile.for_collection(collection_name)
+        self.sparse = (
+            SparseEncoder.for_collection(collection_name)
+            if SparseEncoder.is_enabled(collection_name) else None
+        )
+        self.vector_size = vector_size or self.profile.dimensions
         self.distance = getattr(models.Distance, distance_metric.upper())
-        self.client = AsyncQdrantClient(url=self.url, api_key=self.api_key)
-        self.embedder = EmbeddingGenerator()
+        self.quantization = quantization
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.on_disk = on_disk
+        self.embedder = vector_clients.get_embedder()
+        self.batcher = TokenBatcher(
+            max_batch_tokens=max_batch_tokens,
+            max_batch_items=max_batch_items,
+            model=self.embedder.model
+        )
+        self.max_concurrency = max_concurrency or int(os.getenv("VECTOR_UPSERT_CONCURRENCY", 4))
+        self.max_attempts = max_attempts
+
+    def point_vectors(
+        self,
+        vectors: List[List[float]],
+        texts: Optional[List[str]] = None,
+        sparse_vectors: Optional[List[models.SparseVector]] = None
+    ) -> List[Union[List[float], Dict[str, Any]]]:
+        dense = self.profile.point_vectors(vectors)
+        if self.sparse is None:
+            return dense
+        if sparse_vectors is None:
+            sparse_vectors = self.sparse.encode_documents(texts or [], observe=False)
+        # An unnamed dense vector is addressed as "" once sparse vectors sit alongside it.
+        return [
+            {**(vector if isinstance(vector, dict) else {"": vector}), SPARSE_VECTOR: sparse}
+            for vector, sparse in zip(dense, sparse_vectors)
+        ]
+
+    async def encode_sparse(
+        self,
+        point_ids: List[Union[str, int]],
+        texts: List[str]
+    ) -> Tuple[Optional[List[models.SparseVector]], List[str]]:
+        if self.sparse is None:
+            return None, []
+        # The texts being overwritten must be read before the write; stats move in record_sparse.
+        replaced = await self._sparse_texts(point_ids)
+        return self.sparse.encode_documents(texts, observe=False), replaced
+
+    def record_sparse(self, replaced: List[str], texts: List[str]):
+        # Called only after the upsert landed, so a failed write never skews the frequencies.
+        if self.sparse is not None:
+            self.sparse.forget(replaced)
+            self.sparse.observe(texts)
+
+    async def _sparse_texts(self, point_ids: List[Union[str, int]]) -> List[str]:
+        points = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=["content"],
+            with_vectors=[SPARSE_VECTOR]
+        )
+        # Only points stored with a sparse vector ever reached the document frequencies.
+        return [
+            (point.payload or {}).get("content", "")
+            for point in points
+            if isinstance(point.vector, dict) and SPARSE_VECTOR in point.vector
+        ]
+
+    @property
+    def client(self):
+        # Resolved per call so a registry close/reconnect never leaves a dead client behind.
+        return vector_clients.get_client()
 
     async def _ensure_collection(self):
         try:
-            collections = await self.client.get_collections()
-            exists = any(c.name == self.collection_name for c in collections.collections)
-            
-            if not exists:
-                await self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(
-                        size=self.vector_size, 
-                        distance=self.distance
-                    )
+            await vector_clients.ensure_collection(
+                self.collection_name,
+                **vector_clients.collection_config(
+                    self.vector_size,
+                    distance=self.distance,
+                    quantization=self.quantization,
+                    hnsw_m=self.hnsw_m,
+                    hnsw_ef_construct=self.hnsw_ef_construct,
+                    on_disk=self.on_disk,
+                    full_size=self.profile.full_dimensions if self.profile.named else None,
+                    sparse=self.sparse is not None
                 )
-                logger.info(f"VECTOR_COLLECTION_CREATED | Name: {self.collection_name}")
+            )
+            # A collection without the sparse vector would reject every upsert; go dense-only.
+            if self.sparse is not None:
+                if not await vector_clients.ensure_sparse_vectors(self.collection_name):
+                    self.sparse = None
         except Exception as e:
             logger.error(f"VECTOR_COLLECTION_CHECK_FAILED | Error: {str(e)}")
             raise
 
     async def upsert_documents(
-        self, 
-        texts: List[str], 
-        metadata: List[Dict[str, Any]], 
+        self,
+        texts: List[str],
+        metadata: List[Dict[str, Any]],
         ids: Optional[List[Union[str, int]]] = None,
-        trace_id: Optional[str] = None
-    ) -> bool:
+        trace_id: Optional[str] = None,
+        dedup_scope: Optional[str] = None
+    ) -> UpsertReport:
         t_id = trace_id or str(uuid.uuid4())
         await self._ensure_collection()
-        
-        try:
-            embeddings = await self.embedder.generate(texts, trace_id=t_id)
-            
-            points = []
-            for i, (text, vector) in enumerate(zip(texts, embeddings)):
-                point_id = ids[i] if ids else str(uuid.uuid4())
-                payload = metadata[i] if i < len(metadata) else {}
-                payload["content"] = text
-                
-                points.append(models.PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload=payload
-                ))
-
-            await self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
+
+        point_ids: List[Union[str, int]] = []
+        kept_texts: List[str] = []
+        payloads: List[Dict[str, Any]] = []
+        sizes: List[int] = []
+        rejected: List[Union[str, int]] = []
+        rejected_errors: List[str] = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            point_id = ids[i] if ids else str(uuid.uuid4())
+            # Oversized inputs fail on their own before dedup or any write sees them.
+            try:
+                sizes.append(self.batcher.measure(text))
+            except ValueError as e:
+                rejected.append(point_id)
+                rejected_errors.append(str(e))
+                continue
+            point_ids.append(point_id)
+            kept_texts.append(text)
+            payloads.append({**(metadata[i] if i < len(metadata) else {}), "content": text})
+
+        duplicates: Dict[str, str] = {}
+        if NearDuplicateDetector.is_enabled(self.collection_name) and point_ids:
+            kept, duplicates = await self._screen_duplicates(
+                point_ids, kept_texts, payloads, dedup_scope or "", t_id
             )
-            
-            logger.info(f"VECTOR_UPSERT_SUCCESS | Trace: {t_id} | Count: {len(points)}")
-            return True
+            point_ids = [point_ids[i] for i in kept]
+            kept_texts = [kept_texts[i] for i in kept]
+            payloads = [payloads[i] for i in kept]
+            sizes = [sizes[i] for i in kept]
+
+        batches = [
+            UpsertBatch(
+                index=n,
+                point_ids=[point_ids[i] for i in group],
+                texts=[kept_texts[i] for i in group],
+                payloads=[payloads[i] for i in group]
+            )
+            for n, group in enumerate(self.batcher.split(kept_texts, sizes=sizes))
+        ]
+
+        report = UpsertReport(t_id, batches, duplicates)
+        await self._run_batches(batches, t_id)
+        if rejected:
+            oversized = UpsertBatch(index=len(batches), point_ids=rejected, texts=[], payloads=[])
+            # Retrying cannot shrink the inputs, so retry_failed leaves this batch alone.
+            oversized.retryable = False
+            oversized.error = rejected_errors[0]
+            report.batches.append(oversized)
+            logger.error(
+                f"VECTOR_UPSERT_REJECTED | Trace: {t_id} | Count: {len(rejected)} | "
+                f"Error: {oversized.error}"
+            )
+        if report.succeeded:
+            await self.commit_generation()
+
+        logger.info(
+            f"VECTOR_UPSERT_COMPLETE | Trace: {t_id} | Upserted: {report.upserted_count} | "
+            f"Batches: {len(batches)} | Failed: {len(report.failed)} | "
+            f"Duplicates: {len(duplicates)}"
+        )
+        return report
+
+    async def commit_generation(self):
+        generation = await retrieval_cache.bump_generation(self.collection_name)
+        # The in-process indexes already hold this write, so they need not rebuild for it.
+        for index in (BM25Index, NearDuplicateDetector):
+            if index.is_enabled(self.collection_name):
+                index.for_collection(self.collection_name).note_write(generation)
+
+    async def _screen_duplicates(
+        self,
+        point_ids: List[Union[str, int]],
+        texts: List[str],
+        payloads: List[Dict[str, Any]],
+        scope: str,
+        t_id: str
+    ):
+        detector = NearDuplicateDetector.for_collection(self.collection_name)
+        try:
+            await detector.ensure_warm(self.client)
         except Exception as e:
-            logger.error(f"VECTOR_UPSERT_FAILED | Trace: {t_id} | Error: {str(e)}")
-            return False
+            logger.warning(f"DEDUP_WARM_FAILED | Trace: {t_id} | Error: {str(e)}")
+
+        kept, duplicates, signatures = detector.screen(point_ids, texts, scope)
+        for payload, signature in zip(payloads, signatures):
+            payload["dedup"] = {"signature": f"{signature:016x}", "scope": scope}
+
+        return kept, duplicates
+
+    async def retry_failed(self, report: UpsertReport) -> UpsertReport:
+        failed = [batch for batch in report.failed if batch.retryable]
+        if failed:
+            await self._run_batches(failed, report.trace_id)
+            await self.commit_generation()
+            logger.info(
+                f"VECTOR_UPSERT_RETRY_COMPLETE | Trace: {report.trace_id} | "
+                f"Retried: {len(failed)} | Still Failed: {len(report.failed)}"
+            )
+        return report
+
+    async def _run_batches(self, batches: List[UpsertBatch], t_id: str):
+        embed_slots = asyncio.Semaphore(self.max_concurrency)
+        upsert_slots = asyncio.Semaphore(self.max_concurrency)
+        await asyncio.gather(*[
+            self._process_batch(batch, embed_slots, upsert_slots, t_id) for batch in batches
+        ])
+
+    async def _process_batch(
+        self,
+        batch: UpsertBatch,
+        embed_slots: asyncio.Semaphore,
+        upsert_slots: asyncio.Semaphore,
+        t_id: str
+    ):
+        for attempt in range(self.max_attempts):
+            batch.attempts += 1
+            try:
+                if batch.vectors is None:
+                    async with embed_slots:
+                        batch.vectors = await self.embedder.generate(batch.texts, trace_id=t_id)
+
+                if self.sparse is not None and batch.sparse_vectors is None:
+                    batch.sparse_vectors, batch.replaced_texts = await self.encode_sparse(
+                        batch.point_ids, batch.texts
+                    )
+
+                points = [
+                    models.PointStruct(id=point_id, vector=vector, payload=payload)
+                    for point_id, vector, payload in zip(
+                        batch.point_ids,
+                        self.point_vectors(batch.vectors, sparse_vectors=batch.sparse_vectors),
+                        batch.payloads
+                    )
+                ]
+                async with upsert_slots:
+                    await self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=points
+                    )
+
+                self.record_sparse(batch.replaced_texts, batch.texts)
+                if BM25Index.is_enabled(self.collection_name):
+                    bm25 = BM25Index.for_collection(self.collection_name)
+                    bm25.add_many(batch.point_ids, batch.texts)
+                if NearDuplicateDetector.is_enabled(self.collection_name):
+                    detector = NearDuplicateDetector.for_collection(self.collection_name)
+                    for point_id, payload in zip(batch.point_ids, batch.payloads):
+                        detector.add_payload(point_id, payload)
+
+                batch.success = True
+                batch.error = None
+                batch.release()
+                return
+            except Exception as e:
+                batch.error = str(e)
+                logger.warning(
+                    f"VECTOR_UPSERT_BATCH_FAILED | Trace: {t_id} | Batch: {batch.index} | "
+                    f"Attempt: {batch.attempts} | Error: {str(e)}"
+                )
+                if attempt < self.max_attempts - 1:
+                    await asyncio.sleep(min(2 ** attempt, 10))
+
+        logger.error(
+            f"VECTOR_UPSERT_FAILED | Trace: {t_id} | Batch: {batch.index} | Error: {batch.error}"
+        )
 
     async def delete_points(self, point_ids: List[Union[str, int]]) -> bool:
         try:
+            sparse_texts = await self._sparse_texts(point_ids) if self.sparse is not None else []
             await self.client.delete(
                 collection_name=self.collection_name,
                 points_selector=models.PointIdsList(points=point_ids)
             )
+            if self.sparse is not None:
+                self.sparse.forget(sparse_texts)
+            await self.commit_generation()
+            if BM25Index.is_enabled(self.collection_name):
+                keyword_index = BM25Index.for_collection(self.collection_name)
+                for point_id in point_ids:
+                    keyword_index.remove(point_id)
+            if NearDuplicateDetector.is_enabled(self.collection_name):
+                detector = NearDuplicateDetector.for_collection(self.collection_name)
+                for point_id in point_ids:
+                    detector.remove(point_id)
             return True
         except Exception as e:
             logger.error(f"VECTOR_DELETE_FAILED | Error: {str(e)}")
             return False
 
+    async def delete_by_filter(self, filters: Dict[str, Any], batch_size: int = 1000) -> bool:
+        qdrant_filter = models.Filter(must=[
+            models.FieldCondition(key=key, match=models.MatchValue(value=value))
+            for key, value in filters.items()
+        ])
+        point_ids: List[Union[str, int]] = []
+        try:
+            offset = None
+            while True:
+                points, offset = await self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=qdrant_filter,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=False,
+                    with_vectors=False
+                )
+                point_ids.extend(point.id for point in points)
+                if offset is None:
+                    break
+        except Exception as e:
+            logger.error(f"VECTOR_DELETE_FAILED | Error: {str(e)}")
+            return False
+
+        # Deleting by id keeps the keyword, dedup and sparse indexes in step with the collection.
+        return await self.delete_points(point_ids) if point_ids else True
+
     async def close(self):
-        await self.client.close()
\ No newline at end of file
+        # The client is shared process-wide and released through vector_clients.close().
+        if self.sparse is not None and self.sparse.vocab_path:
+            self.sparse.save()
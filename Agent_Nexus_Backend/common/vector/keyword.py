@@ -0,0 +1,134 @@
+import re
+import math
+from array import array
+from collections import Counter
+from typing import List, Dict, Any, Union
+import numpy as np
+from common.vector.per_collection import WarmIndex
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+class BM25Index(WarmIndex):
+    enabled_env = "BM25_COLLECTIONS"
+    warm_fields = ["content"]
+    warm_label = "BM25"
+
+    def __init__(self, collection_name: str, k1: float = 1.5, b: float = 0.75):
+        self.collection_name = collection_name
+        self.k1 = k1
+        self.b = b
+        self._reset()
+        self._init_warm_state()
+
+    def _reset(self):
+        self._postings_rows: Dict[str, array] = {}
+        self._postings_tfs: Dict[str, array] = {}
+        self._doc_lengths = array("I")
+        self._alive = array("b")
+        self._row_ids: List[Union[str, int]] = []
+        self._rows: Dict[str, int] = {}
+        self._live_docs = 0
+        self._live_length = 0
+
+    def __len__(self) -> int:
+        return self._live_docs
+
+    def add(self, point_id: Union[str, int], text: str):
+        self.remove(point_id)
+
+        counts = Counter(tokenize(text))
+        row = len(self._row_ids)
+        self._row_ids.append(point_id)
+        self._rows[str(point_id)] = row
+        self._alive.append(1)
+
+        length = sum(counts.values())
+        self._doc_lengths.append(length)
+        self._live_docs += 1
+        self._live_length += length
+
+        for term, tf in counts.items():
+            if term not in self._postings_rows:
+                self._postings_rows[term] = array("I")
+                self._postings_tfs[term] = array("H")
+            self._postings_rows[term].append(row)
+            self._postings_tfs[term].append(min(tf, 65535))
+
+    def add_many(self, point_ids: List[Union[str, int]], texts: List[str]):
+        for point_id, text in zip(point_ids, texts):
+            self.add(point_id, text)
+
+    def remove(self, point_id: Union[str, int]):
+        row = self._rows.pop(str(point_id), None)
+        if row is None or not self._alive[row]:
+            return
+
+        # Postings keep the dead row until compact(); search masks it out.
+        self._alive[row] = 0
+        self._live_docs -= 1
+        self._live_length -= self._doc_lengths[row]
+
+        dead_rows = len(self._row_ids) - self._live_docs
+        if dead_rows > 1000 and dead_rows > self._live_docs:
+            self.compact()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        terms = [term for term in set(tokenize(query)) if term in self._postings_rows]
+        if not terms or self._live_docs == 0 or limit <= 0:
+            return []
+
+        doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32).astype(np.float32)
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        avg_length = self._live_length / self._live_docs if self._live_docs else 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths / max(avg_length, 1e-9))
+        scores = np.zeros(len(self._row_ids), dtype=np.float32)
+
+        for term in terms:
+            rows = np.frombuffer(self._postings_rows[term], dtype=np.uint32)
+            tfs = np.frombuffer(self._postings_tfs[term], dtype=np.uint16).astype(np.float32)
+            df = int(alive[rows].sum())
+            if df == 0:
+                continue
+            idf = math.log(1 + (self._live_docs - df + 0.5) / (df + 0.5))
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm[rows])
+
+        scores[~alive] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.size == 0:
+            return []
+
+        k = min(limit, candidates.size)
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        # BM25 scores are unbounded, not cosine; they stay out of "score" until fusion.
+        return [{"id": self._row_ids[row], "keyword_score": float(scores[row])} for row in top]
+
+    def compact(self):
+        live_rows = [row for row in range(len(self._row_ids)) if self._alive[row]]
+        remap = {old: new for new, old in enumerate(live_rows)}
+
+        for term in list(self._postings_rows):
+            rows, tfs = array("I"), array("H")
+            for row, tf in zip(self._postings_rows[term], self._postings_tfs[term]):
+                if row in remap:
+                    rows.append(remap[row])
+                    tfs.append(tf)
+            if rows:
+                self._postings_rows[term], self._postings_tfs[term] = rows, tfs
+            else:
+                del self._postings_rows[term], self._postings_tfs[term]
+
+        self._doc_lengths = array("I", (self._doc_lengths[row] for row in live_rows))
+        self._alive = array("b", [1] * len(live_rows))
+        self._row_ids = [self._row_ids[row] for row in live_rows]
+        self._rows = {str(point_id): row for row, point_id in enumerate(self._row_ids)}
+
+    def _load_point(self, point: Any) -> bool:
+        content = (point.payload or {}).get("content")
+        if not content or str(point.id) in self._rows:
+            return False
+        self.add(point.id, content)
+        return True
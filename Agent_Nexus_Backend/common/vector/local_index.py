@@ -0,0 +1,409 @@
+import os
+import json
+import uuid
+from typing import List, Dict, Any, Optional, Union, Tuple
+import numpy as np
+from common.config.logging import logger
+from common.vector.client import vector_clients
+from common.vector.cache import retrieval_cache
+from common.vector.indexing import UpsertBatch, UpsertReport
+from common.vector.results import project_payload
+from common.vector.profiles import EmbeddingProfile
+
+class LocalVectorIndex:
+    _instances: Dict[str, "LocalVectorIndex"] = {}
+
+    @classmethod
+    def for_collection(
+        cls,
+        collection_name: str,
+        vector_size: Optional[int] = None
+    ) -> "LocalVectorIndex":
+        if collection_name not in cls._instances:
+            index = cls(collection_name, vector_size=vector_size)
+            if index.storage_dir and os.path.exists(index._path("vectors.npy")):
+                index.load()
+            cls._instances[collection_name] = index
+        return cls._instances[collection_name]
+
+    def __init__(
+        self,
+        collection_name: str,
+        vector_size: Optional[int] = None,
+        storage_dir: Optional[str] = None,
+        initial_capacity: int = 1024
+    ):
+        self.collection_name = collection_name
+        self.profile = EmbeddingProfile.for_collection(collection_name)
+        self.vector_size = vector_size or self.profile.dimensions
+        base_dir = storage_dir or os.getenv("LOCAL_VECTOR_DIR")
+        self.storage_dir = os.path.join(base_dir, collection_name) if base_dir else None
+        self.embedder = vector_clients.get_embedder()
+
+        self._matrix = np.zeros((initial_capacity, self.vector_size), dtype=np.float32)
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+        self._count = 0
+        self._ids: List[Union[str, int]] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._bitmaps: Dict[str, Dict[Tuple[type, Any], np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self._alive[:self._count].sum())
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.storage_dir, name)
+
+    def _ensure_capacity(self, needed: int):
+        capacity = self._matrix.shape[0]
+        if needed <= capacity and self._matrix.flags.writeable:
+            return
+
+        new_capacity = max(needed, capacity * 2 if needed > capacity else capacity)
+        matrix = np.zeros((new_capacity, self.vector_size), dtype=np.float32)
+        matrix[:self._count] = self._matrix[:self._count]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self._count] = self._alive[:self._count]
+        self._matrix, self._alive = matrix, alive
+
+        for values in self._bitmaps.values():
+            for value, bits in values.items():
+                grown = np.zeros(new_capacity, dtype=bool)
+                grown[:bits.shape[0]] = bits
+                values[value] = grown
+
+    @staticmethod
+    def _flatten(payload: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+        flat: Dict[str, Any] = {}
+        for key, value in payload.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                flat.update(LocalVectorIndex._flatten(value, f"{path}."))
+            elif isinstance(value, (str, int, float, bool)) and path != "content":
+                flat[path] = value
+        return flat
+
+    @staticmethod
+    def _bitmap_key(value: Any) -> Tuple[type, Any]:
+        # True == 1 and hash alike, so the type keeps bool and int postings apart.
+        return type(value), value
+
+    def _set_bits(self, row: int, payload: Dict[str, Any], state: bool):
+        for field, value in self._flatten(payload).items():
+            values = self._bitmaps.setdefault(field, {})
+            key = self._bitmap_key(value)
+            bits = values.get(key)
+            if bits is None:
+                if not state:
+                    continue
+                bits = values[key] = np.zeros(self._matrix.shape[0], dtype=bool)
+            bits[row] = state
+
+    def upsert_vectors(
+        self,
+        ids: List[Union[str, int]],
+        vectors: List[List[float]],
+        payloads: List[Dict[str, Any]]
+    ) -> int:
+        if not ids:
+            return 0
+
+        block = np.array(vectors, dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block /= np.where(norms == 0, 1.0, norms)
+
+        self._ensure_capacity(self._count + len(ids))
+        for point_id, vector, payload in zip(ids, block, payloads):
+            key = str(point_id)
+            row = self._rows.get(key)
+            if row is None:
+                row = self._count
+                self._count += 1
+                self._rows[key] = row
+                self._ids.append(point_id)
+                self._payloads.append(payload)
+            else:
+                self._set_bits(row, self._payloads[row], False)
+                self._payloads[row] = payload
+
+            self._matrix[row] = vector
+            self._alive[row] = True
+            self._set_bits(row, payload, True)
+
+        return len(ids)
+
+    async def upsert_documents(
+        self,
+        texts: List[str],
+        metadata: List[Dict[str, Any]],
+        ids: Optional[List[Union[str, int]]] = None,
+        trace_id: Optional[str] = None,
+        dedup_scope: Optional[str] = None
+    ) -> UpsertReport:
+        # dedup_scope is accepted for parity with VectorIndexer; local collections are not screened.
+        t_id = trace_id or str(uuid.uuid4())
+        kept = [i for i, text in enumerate(texts) if text and text.strip()]
+        batch = UpsertBatch(
+            index=0,
+            point_ids=[ids[i] if ids else str(uuid.uuid4()) for i in kept],
+            texts=[texts[i] for i in kept],
+            payloads=[
+                {**(metadata[i] if i < len(metadata) else {}), "content": texts[i]}
+                for i in kept
+            ]
+        )
+        batch.attempts = 1
+
+        try:
+            vectors = await self.embedder.generate(batch.texts, trace_id=t_id)
+            self.upsert_vectors(batch.point_ids, self.profile.project_many(vectors), batch.payloads)
+            await retrieval_cache.bump_generation(self.collection_name)
+            batch.success = True
+            batch.release()
+            logger.info(f"LOCAL_VECTOR_UPSERT_SUCCESS | Trace: {t_id} | Count: {len(kept)}")
+        except Exception as e:
+            batch.error = str(e)
+            logger.error(f"LOCAL_VECTOR_UPSERT_FAILED | Trace: {t_id} | Error: {str(e)}")
+
+        return UpsertReport(t_id, [batch])
+
+    async def delete_points(self, point_ids: List[Union[str, int]]) -> bool:
+        for point_id in point_ids:
+            row = self._rows.pop(str(point_id), None)
+            if row is None:
+                continue
+            self._alive[row] = False
+            self._set_bits(row, self._payloads[row], False)
+            self._payloads[row] = {}
+        await retrieval_cache.bump_generation(self.collection_name)
+        return True
+
+    async def delete_by_filter(self, filters: Dict[str, Any]) -> bool:
+        rows = np.flatnonzero(self._filter_mask(filters))
+        return await self.delete_points([self._ids[row] for row in rows]) if rows.size else True
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        mask = self._alive[:self._count].copy()
+        for field, value in (filters or {}).items():
+            bits = self._bitmaps.get(field, {}).get(self._bitmap_key(value))
+            if bits is None:
+                return np.zeros(self._count, dtype=bool)
+            mask &= bits[:self._count]
+        return mask
+
+    def search_vector(
+        self,
+        vector: List[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        if self._count == 0 or limit <= 0:
+            return []
+
+        query = np.array(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query /= norm
+
+        mask = self._filter_mask(filters)
+        if mask.all():
+            rows = np.arange(self._count)
+            scores = self._matrix[:self._count] @ query
+        else:
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            scores = self._matrix[rows] @ query
+
+        k = min(limit, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for position in top:
+            score = float(scores[position])
+            if score_threshold is not None and score < score_threshold:
+                break
+            row = int(rows[position])
+            result = {
+                "id": self._ids[row],
+                "score": score,
+                "payload": project_payload(self._payloads[row], payload_fields, exclude_fields)
+            }
+            if with_vectors:
+                result["vector"] = self._matrix[row].tolist()
+            results.append(result)
+        return results
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        score_threshold: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        trace_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        t_id = trace_id or str(uuid.uuid4())
+
+        try:
+            query_vector = await self.embedder.generate_single(query, trace_id=t_id)
+        except Exception as e:
+            logger.error(f"LOCAL_VECTOR_SEARCH_FAILED | Trace: {t_id} | Error: {str(e)}")
+            return []
+
+        return await self.search_by_vector(
+            query_vector,
+            limit=limit,
+            score_threshold=score_threshold,
+            filters=filters,
+            with_vectors=with_vectors,
+            payload_fields=payload_fields,
+            exclude_fields=exclude_fields,
+            trace_id=t_id
+        )
+
+    async def search_by_vector(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        trace_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        t_id = trace_id or str(uuid.uuid4())
+
+        try:
+            results = self.search_vector(
+                self.profile.project(query_vector),
+                limit,
+                score_threshold,
+                filters,
+                with_vectors,
+                payload_fields,
+                exclude_fields
+            )
+            for result in results:
+                result["trace_id"] = t_id
+
+            logger.info(f"LOCAL_VECTOR_SEARCH_SUCCESS | Trace: {t_id} | Hits: {len(results)}")
+            return results
+        except Exception as e:
+            logger.error(f"LOCAL_VECTOR_SEARCH_FAILED | Trace: {t_id} | Error: {str(e)}")
+            return []
+
+    async def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        score_threshold: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        trace_id: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        t_id = trace_id or str(uuid.uuid4())
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        positions = [i for i, q in enumerate(queries) if q and q.strip()]
+        if not positions:
+            return results
+
+        try:
+            query_vectors = await self.embedder.generate(
+                [queries[i] for i in positions],
+                trace_id=t_id
+            )
+            for position, vector in zip(positions, query_vectors):
+                results[position] = self.search_vector(
+                    self.profile.project(vector), limit, score_threshold, filters,
+                    payload_fields=payload_fields, exclude_fields=exclude_fields
+                )
+                for result in results[position]:
+                    result["trace_id"] = t_id
+            return results
+        except Exception as e:
+            logger.error(f"LOCAL_VECTOR_SEARCH_BATCH_FAILED | Trace: {t_id} | Error: {str(e)}")
+            return results
+
+    async def hybrid_search(
+        self,
+        query: str,
+        limit: int = 10,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        mode: Optional[str] = None,
+        trace_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        # Local collections are dense-only; mode is accepted for parity with VectorSearcher.
+        return await self.search(
+            query,
+            limit=limit,
+            payload_fields=payload_fields,
+            exclude_fields=exclude_fields,
+            trace_id=trace_id
+        )
+
+    def save(self):
+        if not self.storage_dir:
+            raise ValueError("LOCAL_VECTOR_STORAGE_DIR_MISSING")
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+        # A loaded index may still be memory-mapped onto vectors.npy, so the files are replaced,
+        # never rewritten in place.
+        live_rows = np.flatnonzero(self._alive[:self._count])
+        staging_path = f"{self._path('vectors.npy')}.tmp"
+        with open(staging_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(self._matrix[live_rows]))
+        os.replace(staging_path, self._path("vectors.npy"))
+
+        staging_path = f"{self._path('points.json')}.tmp"
+        with open(staging_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "vector_size": self.vector_size,
+                "ids": [self._ids[row] for row in live_rows],
+                "payloads": [self._payloads[row] for row in live_rows]
+            }, f)
+        os.replace(staging_path, self._path("points.json"))
+
+        logger.info(
+            f"LOCAL_VECTOR_SAVED | Collection: {self.collection_name} | Count: {live_rows.size}"
+        )
+
+        # The save compacted away deleted rows; re-map so the old file is released.
+        if isinstance(self._matrix, np.memmap):
+            self.load(mmap=True)
+
+    def load(self, mmap: bool = True):
+        matrix = np.load(self._path("vectors.npy"), mmap_mode="r" if mmap else None)
+        with open(self._path("points.json"), encoding="utf-8") as f:
+            points = json.load(f)
+
+        self.vector_size = points["vector_size"]
+        self._matrix = matrix
+        self._count = matrix.shape[0]
+        self._alive = np.ones(self._count, dtype=bool)
+        self._ids = points["ids"]
+        self._payloads = points["payloads"]
+        self._rows = {str(point_id): row for row, point_id in enumerate(self._ids)}
+        self._bitmaps = {}
+        for row, payload in enumerate(self._payloads):
+            self._set_bits(row, payload, True)
+
+        logger.info(
+            f"LOCAL_VECTOR_LOADED | Collection: {self.collection_name} | Count: {self._count} | "
+            f"mmap: {mmap}"
+        )
+
+    async def close(self):
+        if self.storage_dir:
+            self.save()
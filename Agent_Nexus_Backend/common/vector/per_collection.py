@@ -0,0 +1,100 @@
+import os
+import abc
+import time
+import asyncio
+from typing import List, Dict, Any, Optional, Set
+from common.config.logging import logger
+from common.vector.cache import retrieval_cache
+
+def enabled_collections(env_var: str) -> Set[str]:
+    return {name.strip() for name in os.getenv(env_var, "").split(",") if name.strip()}
+
+class CollectionRegistry:
+    enabled_env: str = ""
+    _instances: Dict[str, Any] = {}
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._instances = {}
+
+    @classmethod
+    def is_enabled(cls, collection_name: str) -> bool:
+        enabled = enabled_collections(cls.enabled_env)
+        return collection_name in enabled or "*" in enabled
+
+    @classmethod
+    def for_collection(cls, collection_name: str):
+        if collection_name not in cls._instances:
+            cls._instances[collection_name] = cls(collection_name)
+        return cls._instances[collection_name]
+
+class WarmIndex(CollectionRegistry, abc.ABC):
+    warm_fields: List[str] = []
+    warm_label: str = "VECTOR"
+
+    def _init_warm_state(self):
+        self._warm = False
+        self._warm_lock = asyncio.Lock()
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+        self.refresh_interval = float(os.getenv("VECTOR_INDEX_REFRESH_INTERVAL", 5))
+
+    @abc.abstractmethod
+    def _reset(self):
+        ...
+
+    @abc.abstractmethod
+    def _load_point(self, point: Any) -> bool:
+        ...
+
+    def note_write(self, generation: Optional[int]):
+        # This worker's write is applied; adopt its generation only if no other worker wrote since.
+        if (
+            generation is not None
+            and self._generation is not None
+            and generation == self._generation + 1
+        ):
+            self._generation = generation
+
+    def _fresh(self) -> bool:
+        return self._warm and time.monotonic() - self._checked_at < self.refresh_interval
+
+    async def ensure_warm(self, client: Any, batch_size: int = 1000):
+        if self._fresh():
+            return
+
+        async with self._warm_lock:
+            if self._fresh():
+                return
+
+            # Other workers' writes only reach this copy through a rebuild, triggered by the
+            # collection's retrieval-cache generation. Without Redis the index is process-local.
+            generation = await retrieval_cache.generation(self.collection_name)
+            self._checked_at = time.monotonic()
+            if self._warm and (generation is None or generation == self._generation):
+                return
+            if self._warm:
+                self._warm = False
+                self._reset()
+
+            offset = None
+            loaded = 0
+            while True:
+                points, offset = await client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=self.warm_fields,
+                    with_vectors=False
+                )
+                for point in points:
+                    loaded += self._load_point(point)
+                if offset is None:
+                    break
+
+            self._generation = generation
+            self._warm = True
+            logger.info(
+                f"{self.warm_label}_INDEX_WARMED | Collection: {self.collection_name} | "
+                f"Loaded: {loaded} | Generation: {generation}"
+            )
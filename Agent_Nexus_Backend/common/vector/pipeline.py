@@ -0,0 +1,259 @@
+import os
+import uuid
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator
+from qdrant_client.http import models
+from common.config.logging import logger
+from common.data_sdk.transformation import DataTransformer
+from common.vector.indexing import VectorIndexer
+from common.vector.keyword import BM25Index
+
+_STAGE_DONE = object()
+
+class IndexPipeline:
+    def __init__(
+        self,
+        collection_name: str,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        strategy: str = "recursive",
+        chunk_workers: int = 2,
+        embed_workers: int = 4,
+        upsert_workers: int = 2,
+        queue_size: Optional[int] = None,
+        indexer: Optional[VectorIndexer] = None
+    ):
+        self.collection_name = collection_name
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.strategy = strategy
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.upsert_workers = upsert_workers
+        self.queue_size = queue_size or int(os.getenv("INDEX_PIPELINE_QUEUE_SIZE", 256))
+        self.indexer = indexer or VectorIndexer(collection_name=collection_name)
+        self.batcher = self.indexer.batcher
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats: Dict[str, int] = {
+            "documents": 0,
+            "chunks": 0,
+            "upserted": 0,
+            "failed": 0
+        }
+
+    async def run(
+        self,
+        documents: AsyncIterator[Dict[str, Any]],
+        trace_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        t_id = trace_id or str(uuid.uuid4())
+        self._reset_stats()
+        await self.indexer._ensure_collection()
+
+        transformer = DataTransformer(trace_id=t_id)
+        documents_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunks_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        points_q: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.queue_size // 8))
+
+        # A failing worker cancels every sibling, so no stage is left blocked on a full queue.
+        try:
+            async with asyncio.TaskGroup() as group:
+                producer = group.create_task(self._produce(documents, documents_q))
+                chunkers = [
+                    group.create_task(self._chunk_stage(transformer, documents_q, chunks_q, t_id))
+                    for _ in range(self.chunk_workers)
+                ]
+                embedders = [
+                    group.create_task(self._embed_stage(chunks_q, points_q, t_id))
+                    for _ in range(self.embed_workers)
+                ]
+                upserters = [
+                    group.create_task(self._upsert_stage(points_q, t_id))
+                    for _ in range(self.upsert_workers)
+                ]
+                group.create_task(self._close_stages([
+                    ([producer], chunkers, documents_q),
+                    (chunkers, embedders, chunks_q),
+                    (embedders, upserters, points_q)
+                ]))
+        except BaseExceptionGroup as e:
+            logger.error(f"INDEX_PIPELINE_ABORTED | Trace: {t_id} | Error: {str(e.exceptions[0])}")
+            raise e.exceptions[0]
+
+        if self.stats["upserted"]:
+            await self.indexer.commit_generation()
+
+        logger.info(
+            f"INDEX_PIPELINE_COMPLETE | Trace: {t_id} | Collection: {self.collection_name} | "
+            f"Documents: {self.stats['documents']} | Chunks: {self.stats['chunks']} | "
+            f"Upserted: {self.stats['upserted']} | Failed: {self.stats['failed']}"
+        )
+        return {"trace_id": t_id, **self.stats}
+
+    async def _close_stages(self, stages: List[Any]):
+        for upstream, downstream, queue in stages:
+            await asyncio.wait(upstream)
+            for _ in downstream:
+                await queue.put(_STAGE_DONE)
+
+    async def _produce(self, documents: AsyncIterator[Dict[str, Any]], out_q: asyncio.Queue):
+        async for document in documents:
+            await out_q.put(document)
+            self.stats["documents"] += 1
+
+    async def _chunk_stage(
+        self,
+        transformer: DataTransformer,
+        in_q: asyncio.Queue,
+        out_q: asyncio.Queue,
+        t_id: str
+    ):
+        while True:
+            document = await in_q.get()
+            if document is _STAGE_DONE:
+                return
+
+            content = document.get("content") or ""
+            if not content.strip():
+                continue
+
+            doc_id = document.get("id")
+            try:
+                chunks = await transformer.chunk_text(
+                    content,
+                    chunk_size=self.chunk_size,
+                    chunk_overlap=self.chunk_overlap,
+                    strategy=self.strategy
+                )
+            except Exception as e:
+                logger.error(f"INDEX_PIPELINE_CHUNK_FAILED | Document: {doc_id} | Error: {str(e)}")
+                continue
+
+            for position, chunk in enumerate(chunks):
+                # The embedder drops blank inputs, which would misalign the later vectors.
+                if not chunk["content"].strip():
+                    continue
+                try:
+                    tokens = self.batcher.measure(chunk["content"])
+                except ValueError as e:
+                    self.stats["failed"] += 1
+                    logger.error(
+                        f"INDEX_PIPELINE_CHUNK_REJECTED | Trace: {t_id} | Document: {doc_id} | "
+                        f"Error: {str(e)}"
+                    )
+                    continue
+
+                point_id = (
+                    str(uuid.uuid5(uuid.NAMESPACE_URL, f"{doc_id}:{position}"))
+                    if doc_id is not None else str(uuid.uuid4())
+                )
+                payload = {
+                    **(document.get("metadata") or {}),
+                    **chunk["metadata"],
+                    "doc_id": doc_id,
+                    "chunk_index": position,
+                    "content": chunk["content"]
+                }
+                await out_q.put((point_id, chunk["content"], payload, tokens))
+                self.stats["chunks"] += 1
+
+    async def _next_batch(self, in_q: asyncio.Queue, held: List[Any]) -> Optional[List[Any]]:
+        first = held.pop() if held else await in_q.get()
+        if first is _STAGE_DONE:
+            return None
+
+        batch = [first]
+        tokens = first[3]
+        while len(batch) < self.batcher.max_batch_items and not in_q.empty():
+            candidate = in_q.get_nowait()
+            if candidate is _STAGE_DONE:
+                # Hand the sentinel back so this worker stops after flushing its batch.
+                in_q.put_nowait(candidate)
+                break
+            if tokens + candidate[3] > self.batcher.max_batch_tokens:
+                # Over budget: this worker opens its next batch with the chunk.
+                held.append(candidate)
+                break
+            batch.append(candidate)
+            tokens += candidate[3]
+        return batch
+
+    async def _embed_stage(self, in_q: asyncio.Queue, out_q: asyncio.Queue, t_id: str):
+        held: List[Any] = []
+        while True:
+            batch = await self._next_batch(in_q, held)
+            if batch is None:
+                return
+
+            vectors = await self._embed_with_retry([item[1] for item in batch], t_id)
+            if vectors is None:
+                self.stats["failed"] += len(batch)
+                continue
+
+            try:
+                sparse_vectors, replaced = await self.indexer.encode_sparse(
+                    [item[0] for item in batch], [item[1] for item in batch]
+                )
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.error(
+                    f"INDEX_PIPELINE_SPARSE_FAILED | Trace: {t_id} | Count: {len(batch)} | "
+                    f"Error: {str(e)}"
+                )
+                continue
+
+            points = [
+                models.PointStruct(id=point_id, vector=vector, payload=payload)
+                for (point_id, _, payload, _), vector in zip(
+                    batch, self.indexer.point_vectors(vectors, sparse_vectors=sparse_vectors)
+                )
+            ]
+            await out_q.put((points, replaced))
+
+    async def _embed_with_retry(self, texts: List[str], t_id: str) -> Optional[List[List[float]]]:
+        for attempt in range(self.indexer.max_attempts):
+            try:
+                vectors = await self.indexer.embedder.generate(texts, trace_id=t_id)
+                if len(vectors) != len(texts):
+                    raise ValueError(
+                        f"EMBEDDING_COUNT_MISMATCH | Expected: {len(texts)} | Got: {len(vectors)}"
+                    )
+                return vectors
+            except Exception as e:
+                logger.warning(
+                    f"INDEX_PIPELINE_EMBED_FAILED | Trace: {t_id} | Count: {len(texts)} | "
+                    f"Attempt: {attempt + 1} | Error: {str(e)}"
+                )
+                if attempt < self.indexer.max_attempts - 1:
+                    await asyncio.sleep(min(2 ** attempt, 10))
+        return None
+
+    async def _upsert_stage(self, in_q: asyncio.Queue, t_id: str):
+        while True:
+            item = await in_q.get()
+            if item is _STAGE_DONE:
+                return
+            points, replaced = item
+
+            try:
+                await self.indexer.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points
+                )
+                self.stats["upserted"] += len(points)
+            except Exception as e:
+                self.stats["failed"] += len(points)
+                logger.error(
+                    f"INDEX_PIPELINE_UPSERT_FAILED | Trace: {t_id} | Count: {len(points)} | "
+                    f"Error: {str(e)}"
+                )
+                continue
+
+            self.indexer.record_sparse(replaced, [point.payload["content"] for point in points])
+            if BM25Index.is_enabled(self.collection_name):
+                BM25Index.for_collection(self.collection_name).add_many(
+                    [point.id for point in points],
+                    [point.payload["content"] for point in points]
+                )
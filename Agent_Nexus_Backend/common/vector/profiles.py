@@ -0,0 +1,90 @@
+import os
+from typing import List, Dict, Any, Optional, Union
+import numpy as np
+from common.config.logging import logger
+
+DENSE_VECTOR = "dense"
+FULL_VECTOR = "full"
+
+class EmbeddingProfile:
+    _instances: Dict[str, "EmbeddingProfile"] = {}
+
+    @classmethod
+    def _configured(cls) -> Dict[str, Dict[str, Any]]:
+        # EMBEDDING_PROFILES="short_term_semantic:256,chat_recall:512:full"
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for entry in os.getenv("EMBEDDING_PROFILES", "").split(","):
+            parts = [part.strip() for part in entry.split(":") if part.strip()]
+            if len(parts) < 2:
+                continue
+            profiles[parts[0]] = {"dimensions": int(parts[1]), "keep_full": "full" in parts[2:]}
+        return profiles
+
+    @classmethod
+    def for_collection(cls, collection_name: str) -> "EmbeddingProfile":
+        if collection_name not in cls._instances:
+            options = cls._configured().get(collection_name, {})
+            cls._instances[collection_name] = cls(collection_name, **options)
+        return cls._instances[collection_name]
+
+    def __init__(
+        self,
+        name: str,
+        model: str = "text-embedding-3-small",
+        dimensions: Optional[int] = None,
+        keep_full: bool = False,
+        rescore_oversampling: float = 4.0
+    ):
+        self.name = name
+        self.model = model
+        self.full_dimensions = 1536 if "small" in model else 3072
+        self.dimensions = min(dimensions or self.full_dimensions, self.full_dimensions)
+        self.keep_full = keep_full and self.truncated
+        self.rescore_oversampling = rescore_oversampling
+
+        if self.truncated:
+            logger.info(
+                f"EMBEDDING_PROFILE_ACTIVE | Profile: {name} | "
+                f"Dimensions: {self.dimensions}/{self.full_dimensions} | "
+                f"Keep Full: {self.keep_full}"
+            )
+
+    @property
+    def truncated(self) -> bool:
+        return self.dimensions < self.full_dimensions
+
+    @property
+    def named(self) -> bool:
+        return self.keep_full
+
+    def project(self, vector: List[float]) -> List[float]:
+        if not self.truncated or not vector:
+            return vector
+        # Matryoshka embeddings survive prefix truncation once rescaled to unit length.
+        head = np.array(vector[:self.dimensions], dtype=np.float32)
+        norm = float(np.linalg.norm(head))
+        if norm > 0:
+            head /= norm
+        return head.tolist()
+
+    def project_many(self, vectors: List[List[float]]) -> List[List[float]]:
+        if not self.truncated or not vectors:
+            return vectors
+        block = np.array([v[:self.dimensions] for v in vectors], dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block /= np.where(norms == 0, 1.0, norms)
+        return block.tolist()
+
+    def point_vectors(
+        self,
+        vectors: List[List[float]]
+    ) -> List[Union[List[float], Dict[str, List[float]]]]:
+        projected = self.project_many(vectors)
+        if not self.named:
+            return projected
+        return [{DENSE_VECTOR: head, FULL_VECTOR: full} for head, full in zip(projected, vectors)]
+
+    def dense_vector(self, vector: Any) -> Optional[List[float]]:
+        if isinstance(vector, dict):
+            return vector.get(DENSE_VECTOR)
+        return vector
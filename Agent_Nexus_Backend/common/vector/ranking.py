@@ -1,14 +1,94 @@
+import os
+import time
 import uuid
+from datetime import datetime
 from typing import List, Dict, Any, Optional
+import numpy as np
 from common.config.logging import logger
 
+def _to_epoch(value: Any) -> float:
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return np.nan
+
 class ResultRanker:
-    def __init__(self, trace_id: Optional[str] = None):
+    def __init__(self, trace_id: Optional[str] = None, half_life: Optional[float] = None):
         self.trace_id = trace_id or str(uuid.uuid4())
+        self.half_life = half_life or float(os.getenv("RANKING_RECENCY_HALF_LIFE", 7 * 86400))
+
+    @staticmethod
+    def _scores(results: List[Dict[str, Any]], key: str = "score") -> np.ndarray:
+        return np.fromiter(
+            (r.get(key) or 0.0 for r in results),
+            dtype=np.float64,
+            count=len(results)
+        )
+
+    @staticmethod
+    def _timestamps(results: List[Dict[str, Any]], timestamp_key: str) -> np.ndarray:
+        def lookup(result: Dict[str, Any]) -> Any:
+            payload = result.get("payload") or {}
+            if timestamp_key in payload:
+                return payload[timestamp_key]
+            return (payload.get("metadata") or {}).get(timestamp_key)
+
+        return np.fromiter(
+            (_to_epoch(lookup(r)) for r in results),
+            dtype=np.float64,
+            count=len(results)
+        )
+
+    def _recency(self, timestamps: np.ndarray) -> np.ndarray:
+        # Absolute decay: hits of similar age get similar boosts instead of spanning 0..1.
+        known = np.isfinite(timestamps)
+        recency = np.zeros_like(timestamps)
+        if known.any():
+            age = np.maximum(time.time() - timestamps[known], 0.0)
+            recency[known] = np.exp2(-age / self.half_life)
+        return recency
+
+    def rerank(
+        self,
+        results: List[Dict[str, Any]],
+        recency_weight: float = 0.3,
+        threshold: Optional[float] = None,
+        timestamp_key: str = "created_at"
+    ) -> List[Dict[str, Any]]:
+        if not results:
+            return []
+
+        scores = self._scores(results)
+        rows = np.arange(len(results))
+        if threshold is not None:
+            rows = np.flatnonzero(scores >= threshold)
+            scores = scores[rows]
+
+        if recency_weight:
+            subset = [results[i] for i in rows]
+            recency = self._recency(self._timestamps(subset, timestamp_key))
+            scores = scores * (1 - recency_weight) + recency * recency_weight
+
+        order = rows[np.argsort(-scores, kind="stable")]
+        logger.info(
+            f"RANKING_RERANK_APPLIED | Trace: {self.trace_id} | Before: {len(results)} | "
+            f"After: {len(order)}"
+        )
+        return [results[i] for i in order]
 
     def rerank_by_recency(
-        self, 
-        results: List[Dict[str, Any]], 
+        self,
+        results: List[Dict[str, Any]],
         timestamp_key: str = "created_at",
         weight: float = 0.3
     ) -> List[Dict[str, Any]]:
@@ -16,13 +96,10 @@ class ResultRanker:
             if not results:
                 return []
 
-            ranked_results = sorted(
-                results,
-                key=lambda x: (x.get("score", 0) * (1 - weight)) + 
-                              (float(x.get("payload", {}).get(timestamp_key, 0)) * weight),
-                reverse=True
-            )
-            
+            recency = self._recency(self._timestamps(results, timestamp_key))
+            blended = self._scores(results) * (1 - weight) + recency * weight
+            ranked_results = [results[i] for i in np.argsort(-blended, kind="stable")]
+
             logger.info(f"RANKING_RECENCY_APPLIED | Trace: {self.trace_id} | Count: {len(results)}")
             return ranked_results
         except Exception as e:
@@ -30,56 +107,122 @@ class ResultRanker:
             return results
 
     def apply_threshold(
-        self, 
-        results: List[Dict[str, Any]], 
+        self,
+        results: List[Dict[str, Any]],
         threshold: float = 0.7
     ) -> List[Dict[str, Any]]:
-        filtered = [r for r in results if r.get("score", 0) >= threshold]
+        keep = np.flatnonzero(self._scores(results) >= threshold) if results else []
+        filtered = [results[i] for i in keep]
         logger.info(f"RANKING_THRESHOLD_FILTER | Trace: {self.trace_id} | Before: {len(results)} | After: {len(filtered)}")
         return filtered
 
     def reciprocal_rank_fusion(
-        self, 
-        vector_results: List[Dict[str, Any]], 
-        keyword_results: List[Dict[str, Any]], 
+        self,
+        *result_lists: List[Dict[str, Any]],
         k: int = 60
     ) -> List[Dict[str, Any]]:
-        scores: Dict[str, float] = {}
-        
-        for rank, res in enumerate(vector_results):
-            doc_id = str(res.get("id"))
-            scores[doc_id] = scores.get(doc_id, 0) + 1 / (rank + k)
-            
-        for rank, res in enumerate(keyword_results):
-            doc_id = str(res.get("id"))
-            scores[doc_id] = scores.get(doc_id, 0) + 1 / (rank + k)
-            
+        positions: Dict[str, int] = {}
+        lookup: List[Dict[str, Any]] = []
+        slots: List[int] = []
+        ranks: List[int] = []
+
+        for results in result_lists:
+            for rank, res in enumerate(results):
+                doc_id = str(res.get("id"))
+                slot = positions.get(doc_id)
+                if slot is None:
+                    slot = positions[doc_id] = len(lookup)
+                    lookup.append(res)
+                else:
+                    lookup[slot] = res
+                slots.append(slot)
+                ranks.append(rank)
+
+        if not lookup:
+            return []
+
+        fused = np.zeros(len(lookup), dtype=np.float64)
+        np.add.at(fused, np.asarray(slots), 1.0 / (np.asarray(ranks, dtype=np.float64) + k))
+
         combined = []
-        lookup = {str(r.get("id")): r for r in vector_results + keyword_results}
-        
-        sorted_ids = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        
-        for doc_id, score in sorted_ids:
-            original_doc = lookup[doc_id]
-            original_doc["rrf_score"] = score
+        for slot in np.argsort(-fused, kind="stable"):
+            original_doc = lookup[slot]
+            original_doc["rrf_score"] = float(fused[slot])
             combined.append(original_doc)
-            
-        logger.info(f"RANKING_RRF_COMPLETE | Trace: {self.trace_id} | Total Unique: {len(combined)}")
+
+        logger.info(
+            f"RANKING_RRF_COMPLETE | Trace: {self.trace_id} | Lists: {len(result_lists)} | "
+            f"Total Unique: {len(combined)}"
+        )
         return combined
 
     def diversity_filter(
-        self, 
-        results: List[Dict[str, Any]], 
-        metadata_key: str, 
+        self,
+        results: List[Dict[str, Any]],
+        metadata_key: str,
         max_per_category: int = 2
     ) -> List[Dict[str, Any]]:
-        counts: Dict[str, int] = {}
-        diverse_results = []
-        
-        for res in results:
-            category = res.get("payload", {}).get(metadata_key, "unknown")
-            if counts.get(category, 0) < max_per_category:
-                diverse_results.append(res)
-                counts[category] = counts.get(category, 0) + 1
-                
-        return diverse_results
\ No newline at end of file
+        if not results:
+            return []
+
+        categories = [
+            str((res.get("payload") or {}).get(metadata_key, "unknown")) for res in results
+        ]
+        _, groups = np.unique(categories, return_inverse=True)
+
+        order = np.argsort(groups, kind="stable")
+        sorted_groups = groups[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        first_of_group = np.repeat(group_starts, np.diff(np.r_[group_starts, len(order)]))
+        occurrence = np.empty(len(results), dtype=np.int64)
+        occurrence[order] = np.arange(len(order)) - first_of_group
+
+        return [results[i] for i in np.flatnonzero(occurrence < max_per_category)]
+
+    def maximal_marginal_relevance(
+        self,
+        query_vector: List[float],
+        results: List[Dict[str, Any]],
+        top_k: int = 10,
+        lambda_mult: float = 0.5,
+        vector_key: str = "vector"
+    ) -> List[Dict[str, Any]]:
+        if not results:
+            return []
+
+        candidates = [r for r in results if r.get(vector_key) is not None]
+        if len(candidates) < len(results):
+            logger.warning(
+                f"RANKING_MMR_SKIPPED | Trace: {self.trace_id} | Reason: missing vectors"
+            )
+            return results[:top_k]
+
+        matrix = np.asarray([r[vector_key] for r in candidates], dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        query = np.array(query_vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        relevance = matrix @ query
+        similarity = matrix @ matrix.T
+
+        selected: List[int] = []
+        redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+        available = np.ones(len(candidates), dtype=bool)
+
+        for _ in range(min(top_k, len(candidates))):
+            if selected:
+                mmr = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            else:
+                mmr = relevance.copy()
+            mmr[~available] = -np.inf
+            pick = int(np.argmax(mmr))
+            candidates[pick]["mmr_score"] = float(mmr[pick])
+            selected.append(pick)
+            available[pick] = False
+            redundancy = np.maximum(redundancy, similarity[pick])
+
+        logger.info(
+            f"RANKING_MMR_APPLIED | Trace: {self.trace_id} | Candidates: {len(candidates)} | "
+            f"Selected: {len(selected)}"
+        )
+        return [candidates[i] for i in selected]
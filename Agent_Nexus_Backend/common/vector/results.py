@@ -0,0 +1,103 @@
+from typing import List, Dict, Any, Optional, Union
+from qdrant_client.http import models
+
+class SearchHit:
+    __slots__ = ("id", "score", "payload", "trace_id", "vector", "rrf_score", "mmr_score")
+
+    def __init__(
+        self,
+        id: Union[str, int],
+        score: float,
+        payload: Optional[Dict[str, Any]] = None,
+        trace_id: Optional[str] = None,
+        vector: Optional[List[float]] = None
+    ):
+        self.id = id
+        self.score = score
+        self.payload = payload
+        self.trace_id = trace_id
+        self.vector = vector
+        self.rrf_score: Optional[float] = None
+        self.mmr_score: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any], trace_id: Optional[str] = None) -> "SearchHit":
+        hit = cls(row["id"], row["score"], row.get("payload"), trace_id, row.get("vector"))
+        hit.rrf_score = row.get("rrf_score")
+        hit.mmr_score = row.get("mmr_score")
+        return hit
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        if key in self.__slots__:
+            setattr(self, key, None)
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__ if getattr(self, key) is not None}
+
+    def __repr__(self) -> str:
+        return f"SearchHit(id={self.id!r}, score={self.score!r})"
+
+def payload_selector(
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None
+) -> Union[bool, models.PayloadSelectorInclude, models.PayloadSelectorExclude]:
+    if include:
+        return models.PayloadSelectorInclude(include=list(include))
+    if exclude:
+        return models.PayloadSelectorExclude(exclude=list(exclude))
+    return True
+
+def project_payload(
+    payload: Dict[str, Any],
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    if include:
+        projected: Dict[str, Any] = {}
+        for path in include:
+            parts = path.split(".")
+            source, target = payload, projected
+            for part in parts[:-1]:
+                source = source.get(part) if isinstance(source, dict) else None
+                if not isinstance(source, dict):
+                    break
+                target = target.setdefault(part, {})
+            else:
+                if parts[-1] in source:
+                    target[parts[-1]] = source[parts[-1]]
+        return projected
+
+    if exclude:
+        projected = dict(payload)
+        for path in exclude:
+            parts = path.split(".")
+            target = projected
+            for part in parts[:-1]:
+                if not isinstance(target.get(part), dict):
+                    break
+                target[part] = dict(target[part])
+                target = target[part]
+            else:
+                target.pop(parts[-1], None)
+        return projected
+
+    return payload
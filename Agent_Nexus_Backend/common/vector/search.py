@@ -1,20 +1,76 @@
 import os
 import uuid
+import asyncio
 from typing import List, Dict, Any, Optional, Union
-from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 from common.config.logging import logger
-from common.vector.embeddings import EmbeddingGenerator
+from common.vector.client import vector_clients
 from common.vector.ranking import ResultRanker
+from common.vector.keyword import BM25Index
+from common.vector.results import SearchHit, payload_selector
+from common.vector.profiles import EmbeddingProfile, DENSE_VECTOR, FULL_VECTOR
+from common.vector.sparse import SparseEncoder, SPARSE_VECTOR
 
 class VectorSearcher:
-    def __init__(self, collection_name: str):
-        self.url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.api_key = os.getenv("QDRANT_API_KEY")
+    def __init__(
+        self,
+        collection_name: str,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        hnsw_ef: Optional[int] = None
+    ):
         self.collection_name = collection_name
-        self.client = AsyncQdrantClient(url=self.url, api_key=self.api_key)
-        self.embedder = EmbeddingGenerator()
+        self.embedder = vector_clients.get_embedder()
         self.ranker = ResultRanker()
+        self.profile = EmbeddingProfile.for_collection(collection_name)
+        self.oversampling = (
+            oversampling or float(os.getenv("VECTOR_SEARCH_OVERSAMPLING", 0)) or None
+        )
+        self.rescore = rescore
+        self.hnsw_ef = hnsw_ef or int(os.getenv("VECTOR_SEARCH_HNSW_EF", 0)) or None
+        self.search_params = self._build_search_params()
+
+    @property
+    def client(self):
+        # Resolved per call so a registry close/reconnect never leaves a dead client behind.
+        return vector_clients.get_client()
+
+    def _build_search_params(self) -> Optional[models.SearchParams]:
+        if not self.oversampling and not self.hnsw_ef:
+            return None
+        quantization = None
+        if self.oversampling:
+            # Oversample on the quantized index, then rescore against the original vectors.
+            quantization = models.QuantizationSearchParams(
+                ignore=False,
+                rescore=self.rescore,
+                oversampling=self.oversampling
+            )
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def _prefetch(
+        self,
+        query_vector: List[float],
+        qdrant_filter: Optional[models.Filter],
+        limit: int
+    ) -> models.Prefetch:
+        # Candidates come from truncated vectors; the outer query rescores at full dimension.
+        return models.Prefetch(
+            query=self.profile.project(query_vector),
+            using=DENSE_VECTOR,
+            filter=qdrant_filter,
+            params=self.search_params,
+            limit=max(limit, int(limit * self.profile.rescore_oversampling))
+        )
+
+    def _build_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[models.Filter]:
+        if not filters:
+            return None
+        conditions = [
+            models.FieldCondition(key=k, match=models.MatchValue(value=v))
+            for k, v in filters.items()
+        ]
+        return models.Filter(must=conditions)
 
     async def search(
         self,
@@ -22,38 +78,80 @@ class VectorSearcher:
         limit: int = 10,
         score_threshold: float = 0.35,
         filters: Optional[Dict[str, Any]] = None,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
         trace_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[SearchHit]:
         t_id = trace_id or str(uuid.uuid4())
         
         try:
             query_vector = await self.embedder.generate_single(query, trace_id=t_id)
-            
-            qdrant_filter = None
-            if filters:
-                conditions = [
-                    models.FieldCondition(key=k, match=models.MatchValue(value=v))
-                    for k, v in filters.items()
-                ]
-                qdrant_filter = models.Filter(must=conditions)
+        except Exception as e:
+            logger.error(f"VECTOR_SEARCH_FAILED | Trace: {t_id} | Error: {str(e)}")
+            return []
 
-            search_result = await self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                query_filter=qdrant_filter,
-                limit=limit,
-                score_threshold=score_threshold,
-                with_payload=True,
-                with_vectors=False
-            )
+        return await self.search_by_vector(
+            query_vector,
+            limit=limit,
+            score_threshold=score_threshold,
+            filters=filters,
+            with_vectors=with_vectors,
+            payload_fields=payload_fields,
+            exclude_fields=exclude_fields,
+            trace_id=t_id
+        )
+
+    async def search_by_vector(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        trace_id: Optional[str] = None
+    ) -> List[SearchHit]:
+        t_id = trace_id or str(uuid.uuid4())
+
+        try:
+            qdrant_filter = self._build_filter(filters)
+            selector = payload_selector(payload_fields, exclude_fields)
+
+            if self.profile.named:
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    prefetch=self._prefetch(query_vector, qdrant_filter, limit),
+                    query=query_vector,
+                    using=FULL_VECTOR,
+                    query_filter=qdrant_filter,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    with_payload=selector,
+                    with_vectors=[DENSE_VECTOR] if with_vectors else False
+                )
+                search_result = response.points
+            else:
+                search_result = await self.client.search(
+                    collection_name=self.collection_name,
+                    query_vector=self.profile.project(query_vector),
+                    query_filter=qdrant_filter,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    search_params=self.search_params,
+                    with_payload=selector,
+                    with_vectors=with_vectors
+                )
 
             results = [
-                {
-                    "id": hit.id,
-                    "score": hit.score,
-                    "payload": hit.payload,
-                    "trace_id": t_id
-                }
+                SearchHit(
+                    hit.id,
+                    hit.score,
+                    hit.payload,
+                    t_id,
+                    self.profile.dense_vector(hit.vector) if with_vectors else None
+                )
                 for hit in search_result
             ]
 
@@ -64,41 +162,236 @@ class VectorSearcher:
             logger.error(f"VECTOR_SEARCH_FAILED | Trace: {t_id} | Error: {str(e)}")
             return []
 
+    async def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 10,
+        score_threshold: float = 0.35,
+        filters: Optional[Dict[str, Any]] = None,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        trace_id: Optional[str] = None
+    ) -> List[List[SearchHit]]:
+        t_id = trace_id or str(uuid.uuid4())
+        results: List[List[SearchHit]] = [[] for _ in queries]
+        positions = [i for i, q in enumerate(queries) if q and q.strip()]
+        if not positions:
+            return results
+
+        try:
+            query_vectors = await self.embedder.generate(
+                [queries[i] for i in positions],
+                trace_id=t_id
+            )
+            qdrant_filter = self._build_filter(filters)
+            selector = payload_selector(payload_fields, exclude_fields)
+
+            if self.profile.named:
+                batch_response = await self.client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=[
+                        models.QueryRequest(
+                            prefetch=self._prefetch(vector, qdrant_filter, limit),
+                            query=vector,
+                            using=FULL_VECTOR,
+                            filter=qdrant_filter,
+                            limit=limit,
+                            score_threshold=score_threshold,
+                            with_payload=selector,
+                            with_vector=False
+                        )
+                        for vector in query_vectors
+                    ]
+                )
+                responses = [response.points for response in batch_response]
+            else:
+                responses = await self.client.search_batch(
+                    collection_name=self.collection_name,
+                    requests=[
+                        models.SearchRequest(
+                            vector=vector,
+                            filter=qdrant_filter,
+                            limit=limit,
+                            score_threshold=score_threshold,
+                            params=self.search_params,
+                            with_payload=selector,
+                            with_vector=False
+                        )
+                        for vector in self.profile.project_many(query_vectors)
+                    ]
+                )
+
+            for position, hits in zip(positions, responses):
+                results[position] = [
+                    SearchHit(hit.id, hit.score, hit.payload, t_id) for hit in hits
+                ]
+
+            logger.info(
+                f"VECTOR_SEARCH_BATCH_SUCCESS | Trace: {t_id} | Queries: {len(positions)} | "
+                f"Hits: {sum(len(r) for r in results)}"
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"VECTOR_SEARCH_BATCH_FAILED | Trace: {t_id} | Error: {str(e)}")
+            return results
+
+    async def _keyword_search(
+        self,
+        query: str,
+        limit: int,
+        selector: Union[bool, models.PayloadSelectorInclude, models.PayloadSelectorExclude] = True
+    ) -> List[Dict[str, Any]]:
+        if BM25Index.is_enabled(self.collection_name):
+            keyword_index = BM25Index.for_collection(self.collection_name)
+            await keyword_index.ensure_warm(self.client)
+            return keyword_index.search(query, limit=limit)
+
+        scroll_result = await self.client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=models.Filter(
+                must=[models.FieldCondition(key="content", match=models.MatchText(text=query))]
+            ),
+            limit=limit,
+            with_payload=selector
+        )
+        return [
+            {"id": hit.id, "payload": hit.payload, "keyword_score": 1.0}
+            for hit in scroll_result[0]
+        ]
+
+    async def _fill_payloads(
+        self,
+        results: List[Dict[str, Any]],
+        selector: Union[bool, models.PayloadSelectorInclude, models.PayloadSelectorExclude] = True
+    ):
+        missing = [r for r in results if r.get("payload") is None]
+        if not missing:
+            return
+
+        points = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[r["id"] for r in missing],
+            with_payload=selector,
+            with_vectors=False
+        )
+        payloads = {str(point.id): point.payload for point in points}
+        for result in missing:
+            result["payload"] = payloads.get(str(result["id"]), {})
+
+    async def _sparse_ready(self) -> bool:
+        if not SparseEncoder.is_enabled(self.collection_name):
+            return False
+        try:
+            return await vector_clients.ensure_sparse_vectors(self.collection_name)
+        except Exception as e:
+            logger.warning(
+                f"VECTOR_SPARSE_CHECK_FAILED | Collection: {self.collection_name} | Error: {str(e)}"
+            )
+            return False
+
+    async def _fused_search(
+        self,
+        query: str,
+        limit: int,
+        payload_fields: Optional[List[str]],
+        exclude_fields: Optional[List[str]],
+        t_id: str
+    ) -> List[SearchHit]:
+        sparse_query = SparseEncoder.for_collection(self.collection_name).encode_query(query)
+        if not sparse_query.indices:
+            return await self.search(
+                query,
+                limit=limit,
+                payload_fields=payload_fields,
+                exclude_fields=exclude_fields,
+                trace_id=t_id
+            )
+
+        try:
+            query_vector = await self.embedder.generate_single(query, trace_id=t_id)
+            response = await self.client.query_points(
+                collection_name=self.collection_name,
+                prefetch=[
+                    models.Prefetch(
+                        query=self.profile.project(query_vector),
+                        using=DENSE_VECTOR if self.profile.named else None,
+                        params=self.search_params,
+                        limit=limit * 2
+                    ),
+                    models.Prefetch(query=sparse_query, using=SPARSE_VECTOR, limit=limit * 2)
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=limit,
+                with_payload=payload_selector(payload_fields, exclude_fields)
+            )
+        except Exception as e:
+            logger.warning(f"HYBRID_FALLBACK_TO_KEYWORD | Trace: {t_id} | Reason: {str(e)}")
+            return await self.hybrid_search(
+                query,
+                limit=limit,
+                payload_fields=payload_fields,
+                exclude_fields=exclude_fields,
+                mode="keyword",
+                trace_id=t_id
+            )
+
+        results = []
+        for hit in response.points:
+            result = SearchHit(hit.id, hit.score, hit.payload, t_id)
+            result.rrf_score = hit.score
+            results.append(result)
+
+        logger.info(f"HYBRID_FUSION_SUCCESS | Trace: {t_id} | Hits: {len(results)}")
+        return results
+
     async def hybrid_search(
         self,
         query: str,
         limit: int = 10,
+        payload_fields: Optional[List[str]] = None,
+        exclude_fields: Optional[List[str]] = None,
+        mode: Optional[str] = None,
         trace_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Union[SearchHit, Dict[str, Any]]]:
         t_id = trace_id or str(uuid.uuid4())
+        selector = payload_selector(payload_fields, exclude_fields)
+        mode = mode or ("sparse" if await self._sparse_ready() else "keyword")
+
+        if mode == "sparse":
+            return await self._fused_search(query, limit, payload_fields, exclude_fields, t_id)
         
-        vector_results = await self.search(query, limit=limit * 2, trace_id=t_id)
-        
-        try:
-            scroll_result = await self.client.scroll(
-                collection_name=self.collection_name,
-                scroll_filter=models.Filter(
-                    must=[models.FieldCondition(key="content", match=models.MatchText(text=query))]
-                ),
+        vector_results, keyword_results = await asyncio.gather(
+            self.search(
+                query,
                 limit=limit * 2,
-                with_payload=True
+                payload_fields=payload_fields,
+                exclude_fields=exclude_fields,
+                trace_id=t_id
+            ),
+            self._keyword_search(query, limit * 2, selector),
+            return_exceptions=True
+        )
+
+        if isinstance(keyword_results, Exception):
+            logger.warning(
+                f"HYBRID_FALLBACK_TO_VECTOR | Trace: {t_id} | Reason: {str(keyword_results)}"
             )
-            
-            keyword_results = [
-                {"id": hit.id, "payload": hit.payload, "score": 1.0} 
-                for hit in scroll_result[0]
-            ]
-            
+            return vector_results[:limit]
+
+        try:
+            # Vector hits go last so their payloads win for documents found by both legs.
             final_results = self.ranker.reciprocal_rank_fusion(
-                vector_results, 
-                keyword_results
-            )
-            
-            return final_results[:limit]
+                keyword_results,
+                vector_results
+            )[:limit]
+            await self._fill_payloads(final_results, selector)
+            return final_results
             
         except Exception as e:
             logger.warning(f"HYBRID_FALLBACK_TO_VECTOR | Trace: {t_id} | Reason: {str(e)}")
             return vector_results[:limit]
 
     async def close(self):
-        await self.client.close()
\ No newline at end of file
+        # The client is shared process-wide and released through vector_clients.close().
+        return None
@@ -0,0 +1,173 @@
+import os
+import json
+import math
+import asyncio
+import hashlib
+from collections import Counter
+from typing import List, Optional
+from qdrant_client.http import models
+from common.config.logging import logger
+from common.vector.keyword import tokenize
+from common.vector.per_collection import CollectionRegistry
+
+SPARSE_VECTOR = "sparse"
+
+class SparseEncoder(CollectionRegistry):
+    enabled_env = "SPARSE_COLLECTIONS"
+
+    def __init__(
+        self,
+        collection_name: str,
+        vocab_dir: Optional[str] = None,
+        hash_space: int = 1 << 24,
+        k1: float = 1.2,
+        b: float = 0.75,
+        autosave_every: Optional[int] = None,
+        autosave_interval: Optional[float] = None
+    ):
+        self.collection_name = collection_name
+        base_dir = vocab_dir or os.getenv("SPARSE_VOCAB_DIR")
+        self.vocab_path = os.path.join(base_dir, f"{collection_name}.json") if base_dir else None
+        self.hash_space = hash_space
+        self.k1 = k1
+        self.b = b
+        self.autosave_every = autosave_every or int(os.getenv("SPARSE_VOCAB_AUTOSAVE", 1000))
+        self.autosave_interval = (
+            autosave_interval or float(os.getenv("SPARSE_VOCAB_AUTOSAVE_INTERVAL", 60))
+        )
+        self._documents = 0
+        self._total_length = 0
+        self._df: Counter = Counter()
+        self._unsaved = 0
+        self._autosave_task: Optional[asyncio.Task] = None
+
+        if self.vocab_path and os.path.exists(self.vocab_path):
+            self.load()
+
+    def _index(self, term: str) -> int:
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest()
+        return int.from_bytes(digest, "big") % self.hash_space
+
+    def _term_counts(self, text: str) -> Counter:
+        return Counter(self._index(term) for term in tokenize(text))
+
+    def idf(self, index: int) -> float:
+        df = self._df.get(index, 0)
+        return math.log(1 + (self._documents - df + 0.5) / (df + 0.5))
+
+    def observe(self, texts: List[str]):
+        for text in texts:
+            counts = self._term_counts(text)
+            self._documents += 1
+            self._total_length += sum(counts.values())
+            self._df.update(counts.keys())
+        self._mark_dirty(len(texts))
+
+    def forget(self, texts: List[str]):
+        # Replaced or deleted documents must leave the statistics, or IDF drifts toward their terms.
+        for text in texts:
+            counts = self._term_counts(text)
+            self._documents = max(self._documents - 1, 0)
+            self._total_length = max(self._total_length - sum(counts.values()), 0)
+            self._df.subtract(counts.keys())
+            for index in counts:
+                if self._df[index] <= 0:
+                    del self._df[index]
+        self._mark_dirty(len(texts))
+
+    def _mark_dirty(self, count: int):
+        if not count or not self.vocab_path:
+            return
+        self._unsaved += count
+        if self._unsaved >= self.autosave_every:
+            self.save()
+            return
+
+        if self._autosave_task is None or self._autosave_task.done():
+            try:
+                self._autosave_task = asyncio.get_running_loop().create_task(self._autosave())
+            except RuntimeError:
+                # No loop to schedule on; the next count threshold or close_all() persists instead.
+                self._autosave_task = None
+
+    async def _autosave(self):
+        await asyncio.sleep(self.autosave_interval)
+        if self._unsaved:
+            try:
+                self.save()
+            except Exception as e:
+                logger.warning(
+                    f"SPARSE_VOCAB_SAVE_FAILED | Collection: {self.collection_name} | "
+                    f"Error: {str(e)}"
+                )
+
+    def encode_documents(self, texts: List[str], observe: bool = True) -> List[models.SparseVector]:
+        # Documents carry saturated TFs; IDF is applied at query time so it never goes stale.
+        if observe:
+            self.observe(texts)
+
+        avg_length = self._total_length / self._documents if self._documents else 1.0
+        vectors = []
+        for text in texts:
+            counts = self._term_counts(text)
+            norm = self.k1 * (1 - self.b + self.b * sum(counts.values()) / max(avg_length, 1e-9))
+            indices = sorted(counts)
+            vectors.append(models.SparseVector(
+                indices=indices,
+                values=[counts[i] * (self.k1 + 1) / (counts[i] + norm) for i in indices]
+            ))
+        return vectors
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        indices = sorted(self._term_counts(text))
+        return models.SparseVector(indices=indices, values=[self.idf(i) for i in indices])
+
+    def save(self):
+        if not self.vocab_path:
+            raise ValueError("SPARSE_VOCAB_PATH_MISSING")
+        os.makedirs(os.path.dirname(self.vocab_path), exist_ok=True)
+
+        staging_path = f"{self.vocab_path}.tmp"
+        with open(staging_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "hash_space": self.hash_space,
+                "documents": self._documents,
+                "total_length": self._total_length,
+                "df": {str(index): count for index, count in self._df.items()}
+            }, f)
+        os.replace(staging_path, self.vocab_path)
+        self._unsaved = 0
+
+        logger.info(
+            f"SPARSE_VOCAB_SAVED | Collection: {self.collection_name} | "
+            f"Documents: {self._documents} | Terms: {len(self._df)}"
+        )
+
+    def load(self):
+        with open(self.vocab_path, encoding="utf-8") as f:
+            vocab = json.load(f)
+
+        self.hash_space = vocab["hash_space"]
+        self._documents = vocab["documents"]
+        self._total_length = vocab["total_length"]
+        self._df = Counter({int(index): count for index, count in vocab["df"].items()})
+
+        logger.info(
+            f"SPARSE_VOCAB_LOADED | Collection: {self.collection_name} | "
+            f"Documents: {self._documents} | Terms: {len(self._df)}"
+        )
+
+    @classmethod
+    async def close_all(cls):
+        for encoder in list(cls._instances.values()):
+            if encoder._autosave_task is not None:
+                encoder._autosave_task.cancel()
+                encoder._autosave_task = None
+            if encoder.vocab_path and encoder._unsaved:
+                try:
+                    encoder.save()
+                except Exception as e:
+                    logger.warning(
+                        f"SPARSE_VOCAB_SAVE_FAILED | Collection: {encoder.collection_name} | "
+                        f"Error: {str(e)}"
+                    )
@@ -5,6 +5,9 @@ from fastapi import FastAPI
 from common.config.logging_config import logger
 from common.memory.vector_db import vector_db_client
 from common.memory.short_term import stm_client
+from common.vector.client import vector_clients
+from common.memory import memory_system
+from common.config.redis_pool import redis_pool
 from lobes import lobe_registry
 
 @asynccontextmanager
@@ -35,7 +38,9 @@ async def lifespan(app: FastAPI):
         
         shutdown_tasks = [
             stm_client.disconnect(),
-            vector_db_client.disconnect()
+            vector_db_client.disconnect(),
+            vector_clients.close(),
+            memory_system.close()
         ]
         
         active_lobes = lobe_registry.list_active_lobes()
@@ -45,4 +50,5 @@ async def lifespan(app: FastAPI):
                 shutdown_tasks.append(lobe.stop())
 
         await asyncio.gather(*shutdown_tasks, return_exceptions=True)
+        await redis_pool.close()
         logger.info("SHUTDOWN_COMPLETE | All resources released", trace_id=trace_id)
\ No newline at end of file
@@ -55,15 +55,21 @@ class VectorBackfiller:
                 ids = [str(row[0]) for row in rows if row[1]]
 
                 if texts:
-                    success = await indexer.upsert_documents(
+                    report = await indexer.upsert_documents(
                         texts=texts,
                         metadata=metadatas,
                         ids=ids,
                         trace_id=trace_id
                     )
-                    
-                    if not success:
-                        logger.error(f"BACKFILL_BATCH_FAILURE | Table: {table_name} | Offset: {offset}")
+
+                    if report.failed:
+                        report = await indexer.retry_failed(report)
+
+                    if report.failed:
+                        logger.error(
+                            f"BACKFILL_BATCH_FAILURE | Table: {table_name} | Offset: {offset} | "
+                            f"Failed IDs: {len(report.failed_ids)}"
+                        )
                         raise Exception("Batch processing failed")
 
                 logger.info(f"BACKFILL_PROGRESS | Table: {table_name} | Processed: {offset + len(rows)}")
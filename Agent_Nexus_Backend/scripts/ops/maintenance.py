@@ -4,17 +4,18 @@ import time
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import text
-from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 from common.config.logging import logger
+from common.vector.client import vector_clients
 
 class MaintenanceManager:
     def __init__(self):
         self.db_url = os.getenv("DATABASE_URL")
-        self.qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.qdrant_key = os.getenv("QDRANT_API_KEY")
         self.engine = create_async_engine(self.db_url)
-        self.vector_client = AsyncQdrantClient(url=self.qdrant_url, api_key=self.qdrant_key)
+
+    @property
+    def vector_client(self):
+        return vector_clients.get_client()
 
     async def vacuum_postgres(self):
         try:
@@ -45,10 +46,10 @@ class MaintenanceManager:
 
     async def optimize_vector_collections(self):
         try:
-            collections = await self.vector_client.get_collections()
-            for col in collections.collections:
+            collections = await vector_clients.known_collections(refresh=True)
+            for name in collections:
                 await self.vector_client.update_collection(
-                    collection_name=col.name,
+                    collection_name=name,
                     optimizer_config=models.OptimizersConfigDiff(indexing_threshold=10000)
                 )
             logger.info("MAINTENANCE_VECTOR_OPTIMIZATION_SUCCESS")
@@ -66,7 +67,7 @@ class MaintenanceManager:
         await self.optimize_vector_collections()
         logger.info("MAINTENANCE_CYCLE_COMPLETE")
         await self.engine.dispose()
-        await self.vector_client.close()
+        await vector_clients.close()
 
 if __name__ == "__main__":
     manager = MaintenanceManager()
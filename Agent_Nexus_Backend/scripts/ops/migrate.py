@@ -4,16 +4,14 @@ import sys
 from typing import List
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import text
-from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
 from common.config.logging import logger
+from common.vector.client import vector_clients
 
 class MigrationManager:
     def __init__(self):
         self.pg_url = os.getenv("DATABASE_URL")
-        self.qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.qdrant_key = os.getenv("QDRANT_API_KEY")
-        
+
         if not self.pg_url:
             logger.critical("MIGRATION_FAILED | DATABASE_URL_MISSING")
             sys.exit(1)
@@ -37,7 +35,6 @@ class MigrationManager:
             await engine.dispose()
 
     async def migrate_vector_storage(self):
-        client = AsyncQdrantClient(url=self.qdrant_url, api_key=self.qdrant_key)
         collections = {
             "memories": 1536,  # OpenAI text-embedding-3-small
             "insights": 1536,
@@ -45,21 +42,14 @@ class MigrationManager:
         }
         
         try:
-            existing = await client.get_collections()
-            existing_names = [c.name for c in existing.collections]
-            
             for name, size in collections.items():
-                if name not in existing_names:
-                    await client.create_collection(
-                        collection_name=name,
-                        vectors_config=models.VectorParams(
-                            size=size,
-                            distance=models.Distance.COSINE
-                        ),
-                        optimizers_config=models.OptimizersConfigDiff(memmap_threshold=20000)
-                    )
-                    logger.info(f"VECTOR_COLLECTION_CREATED | Name: {name}")
-                else:
+                # Quantization, HNSW and on-disk settings follow the QDRANT_* environment defaults.
+                created = await vector_clients.ensure_collection(
+                    name,
+                    **vector_clients.collection_config(size, distance=models.Distance.COSINE),
+                    optimizers_config=models.OptimizersConfigDiff(memmap_threshold=20000)
+                )
+                if not created:
                     logger.info(f"VECTOR_COLLECTION_EXISTS | Name: {name}")
             
             logger.info("VECTOR_MIGRATION_SUCCESS")
@@ -67,7 +57,7 @@ class MigrationManager:
             logger.error(f"VECTOR_MIGRATION_FAILED | Error: {str(e)}")
             raise
         finally:
-            await client.close()
+            await vector_clients.close()
 
     async def execute_all(self):
         logger.info("GLOBAL_MIGRATION_INITIATED")
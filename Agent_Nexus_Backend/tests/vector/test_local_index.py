@@ -0,0 +1,59 @@
+import pytest
+from common.vector.local_index import LocalVectorIndex
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("LOCAL_VECTOR_DIR", raising=False)
+    monkeypatch.setattr(LocalVectorIndex, "_instances", {})
+
+
+def unit_vector(size: int, axis: int):
+    vector = [0.0] * size
+    vector[axis] = 1.0
+    return vector
+
+
+def test_for_collection_builds_with_default_size():
+    index = LocalVectorIndex.for_collection("agent_knowledge")
+
+    assert index.vector_size == index.profile.dimensions
+    assert index._matrix.shape[1] == index.vector_size
+
+    index.upsert_vectors(["a"], [unit_vector(index.vector_size, 0)], [{"agent_id": "x"}])
+    hits = index.search_vector(
+        unit_vector(index.vector_size, 0),
+        limit=1,
+        filters={"agent_id": "x"}
+    )
+    assert [hit["id"] for hit in hits] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_compacting_save_over_memory_mapped_index(tmp_path):
+    index = LocalVectorIndex("mapped", vector_size=4, storage_dir=str(tmp_path))
+    index.upsert_vectors(list("abcd"), [unit_vector(4, axis) for axis in range(4)], [{}] * 4)
+    index.save()
+
+    mapped = LocalVectorIndex("mapped", vector_size=4, storage_dir=str(tmp_path))
+    mapped.load(mmap=True)
+    await mapped.delete_points(["a", "b"])
+    mapped.save()
+
+    assert [hit["id"] for hit in mapped.search_vector(unit_vector(4, 2), limit=1)] == ["c"]
+    assert [hit["id"] for hit in mapped.search_vector(unit_vector(4, 3), limit=1)] == ["d"]
+
+
+@pytest.mark.asyncio
+async def test_delete_by_filter_drops_matching_points():
+    index = LocalVectorIndex("filtered", vector_size=4)
+    index.upsert_vectors(
+        ["a", "b"],
+        [unit_vector(4, 0), unit_vector(4, 1)],
+        [{"metadata": {"agent_id": "x"}}, {"metadata": {"agent_id": "y"}}]
+    )
+
+    assert await index.delete_by_filter({"metadata.agent_id": "x"})
+    assert len(index) == 1
+    assert index.search_vector(unit_vector(4, 0), limit=2, filters={"metadata.agent_id": "x"}) == []